@@ -3,6 +3,8 @@ import pandas as pd
 import plotly.express as px
 import os
 import sys
+import time
+from datetime import datetime
 from streamlit_option_menu import option_menu
 
 # Configure Streamlit page (Must be first Streamlit command)
@@ -19,13 +21,17 @@ except Exception:
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
 
-from tools.orchestrator import main as run_orchestrator
+from tools.orchestrator import iter_leads
 import tools.database as db
 import tools.sheets_db as sheets
+import tools.sync_worker as sync_worker
 
 # Initialize Database
 db.init_db()
 
+# To Do shows the newest unprocessed leads; checked ones vanish and the next move up
+TODO_PAGE_SIZE = 200
+
 # --- GOOGLE SHEETS SYNC (STARTUP) ---
 # Try to restore data from Sheets on boot
 if "sheets_synced" not in st.session_state:
@@ -33,10 +39,27 @@ if "sheets_synced" not in st.session_state:
         success, msg = sheets.sync_sheets_to_sqlite()
         if success:
             print(f"✅ Startup Sync: {msg}")
+            db.invalidate_lead_cache() # Restored rows bypass tools.database
         else:
             print(f"⚠️ Startup Sync Warning: {msg}")
     st.session_state.sheets_synced = True
 
+def collect_edits(df, edited_rows, skip_columns=()):
+    """
+    Turns st.data_editor 'edited_rows' (row position -> changes) into the
+    {lead_id: {column: value}} edit set expected by db.update_leads().
+    """
+    edits = {}
+    for idx, updates in edited_rows.items():
+        try:
+            lead_id = int(df.iloc[int(idx)]["ID"])
+        except (IndexError, ValueError):
+            continue
+        cells = {col: val for col, val in updates.items() if col not in skip_columns}
+        if cells:
+            edits[lead_id] = cells
+    return edits
+
 # Session State
 if "logged_in" not in st.session_state:
     st.session_state.logged_in = False
@@ -188,8 +211,9 @@ with st.sidebar:
     
     if st.button("Manueller Sync 🔄", use_container_width=True):
          with st.spinner("Synchronisiere..."):
-             s1, m1 = sheets.sync_sqlite_to_sheets()
+             s1, m1 = sync_worker.get_worker().sync_now(full=True)
              s2, m2 = sheets.sync_sheets_to_sqlite()
+             db.invalidate_lead_cache()
              if s1 and s2:
                  st.success(f"Upload: {m1} | Download: {m2}")
                  st.session_state.last_sync = datetime.now().strftime("%H:%M:%S")
@@ -200,13 +224,23 @@ with st.sidebar:
              time.sleep(1)
              st.rerun()
 
-    # Sync Status Indicator
+    # Sync Status Indicator (background worker: queue depth & lag)
     st.markdown("---")
-    if "last_sync" in st.session_state:
+    sync_status = sync_worker.get_worker().status()
+    if sync_status["last_success"]:
+        st.caption(f"Letzter Sync: {datetime.fromtimestamp(sync_status['last_success']).strftime('%H:%M:%S')}")
+    elif "last_sync" in st.session_state:
         st.caption(f"Letzter Sync: {st.session_state.last_sync}")
     
-    if "sync_error" in st.session_state and st.session_state.sync_error:
+    if not sync_status["enabled"]:
+        st.caption("⚪ Cloud Status: Google Sheets nicht konfiguriert")
+    elif sync_status["last_error"]:
+        retry = f" (neuer Versuch in {sync_status['retry_in']}s)" if sync_status["retry_in"] is not None else ""
+        st.error(f"Sync Fehler: {sync_status['last_error']}{retry}")
+    elif "sync_error" in st.session_state and st.session_state.sync_error:
         st.error(f"Sync Fehler: {st.session_state.sync_error}")
+    elif sync_status["queue_depth"]:
+        st.caption(f"🟡 Cloud Status: {sync_status['queue_depth']} Leads ausstehend ({sync_status['lag_seconds']:.0f}s Verzögerung)")
     else:
         st.caption("🟢 Cloud Status: Verbunden")
 
@@ -284,29 +318,17 @@ elif page == "To Do":
     st.title("✅ To Do (Offene Leads)")
     st.info("Hier sind alle Leads, die du noch nicht bearbeitet hast (kein Newsletter, kein Warenkorb, kein 'Kein NL').")
     
-    df_all = db.get_user_leads(st.session_state.user_id)
+    uid = st.session_state.user_id
     
-    if not df_all.empty:
-        # Filter for unprocessed leads
-        # Ensure columns exist (db migration should have added them)
-        cols_check = ["Newsletter", "Warenkorb", "Kein NL"]
-        for c in cols_check:
-            if c not in df_all.columns:
-                df_all[c] = 0 # Default to 0 if missing to avoid crash
-        
-        # Filter: All 3 must be False/0/None (handling potential None from SQL)
-        # We treat None as False (0)
-        mask_todo = (
-            (df_all["Newsletter"].fillna(0) == 0) & 
-            (df_all["Warenkorb"].fillna(0) == 0) & 
-            (df_all["Kein NL"].fillna(0) == 0) &
-            (df_all["Trash"].fillna(0) == 0) # Exclude trash
-        )
-        
-        df_todo = df_all[mask_todo].copy()
+    if db.count_user_leads(uid) > 0:
+        # Unprocessed leads are selected in SQL (partial index), only the first page is loaded
+        open_count = db.count_open_todos(uid)
+        df_todo = db.get_open_todos(uid, limit=TODO_PAGE_SIZE)
         
         # Metrics
-        st.metric("Offene Leads", len(df_todo))
+        st.metric("Offene Leads", open_count)
+        if open_count > len(df_todo):
+            st.caption(f"Zeige die neuesten {len(df_todo)} von {open_count} offenen Leads.")
         
         if not df_todo.empty:
             st.markdown('<div class="stCard">', unsafe_allow_html=True)
@@ -340,33 +362,25 @@ elif page == "To Do":
             if "todo_editor" in st.session_state:
                 changes = st.session_state.todo_editor.get("edited_rows", {})
                 
-                # Standard updates
-                for idx, updates in changes.items():
-                    if "Trash" in updates: continue
-                    try:
-                         # Map back to real ID using index
-                         real_row = df_todo.loc[int(idx)]
-                         for col, val in updates.items():
-                             db.update_lead(real_row["ID"], col, val)
-                    except:
-                        pass
+                # Standard updates (one batch; rows marked as Trash wait for the button)
+                db.update_leads(collect_edits(df_todo, {idx: u for idx, u in changes.items() if "Trash" not in u}))
                 
                 # Batch Delete
                 trash_indices = [idx for idx, updates in changes.items() if updates.get("Trash")]
                 if trash_indices:
                      if st.button(f"🗑️ {len(trash_indices)} löschen", key="btn_del_todo"):
-                         for idx in trash_indices:
-                             db.update_lead(df_todo.loc[int(idx)]["ID"], "Trash", True)
+                         trash_edits = collect_edits(df_todo, {idx: {"Trash": True} for idx in trash_indices})
+                         db.update_leads(trash_edits)
                          
-                         # Sync after batch delete
-                         sheets.sync_sqlite_to_sheets()
+                         # Sync after batch delete (background)
+                         sync_worker.request_sync()
                          st.rerun()
 
                 # Force reload if any change happened (except Trash waiting for button)
                 # This gives the "Inbox Zero" effect - items vanish when checked!
                 if len(changes) > 0 and not any("Trash" in u for u in changes.values()):
-                    # Sync after single edit
-                    sheets.sync_sqlite_to_sheets()
+                    # Sync after single edit (background)
+                    sync_worker.request_sync()
                     
                     st.toast("✅ Gespeichert!", icon="🎉")
                     time.sleep(0.5) 
@@ -381,31 +395,63 @@ elif page == "Neue Suche":
     
     st.markdown('<div class="stCard">', unsafe_allow_html=True)
     c1, c2, c3 = st.columns([3, 1, 1])
-    keyword = c1.text_input("Suchbegriff", placeholder="z.B. Marketing Agentur")
-    country = c2.text_input("Land", value="DE")
-    max_results = c3.number_input("Anzahl", min_value=5, max_value=50, value=10)
+    keyword_input = c1.text_area("Suchbegriffe (einer pro Zeile)", placeholder="z.B. Marketing Agentur\nSkincare", height=100)
+    country_input = c2.text_input("Länder (kommagetrennt)", value="DE")
+    max_results = c3.number_input("Anzahl pro Suche", min_value=5, max_value=50, value=10)
     
-    if st.button("Suche Starten 🚀"):
+    # Batch: every keyword in every country, run in parallel
+    keywords = list(dict.fromkeys(k.strip() for k in keyword_input.splitlines() if k.strip()))
+    countries = list(dict.fromkeys(c.strip().upper() for c in country_input.split(",") if c.strip())) or ["DE"]
+    queries = [(k, c) for k in keywords for c in countries]
+    if len(queries) > 1:
+        st.caption(f"{len(queries)} Suchen werden parallel gestartet.")
+    
+    if st.button("Suche Starten 🚀", disabled=not queries):
         progress_text = "Starte Suche..."
         bar = st.progress(0, text=progress_text)
+        live_table = st.empty()
         
         try:
-            bar.progress(10, "Verbinde mit API...")
-            df, stats = run_orchestrator(keywords=[keyword], country=country, max_results=max_results)
-            bar.progress(80, "Speichere Daten...")
+            bar.progress(5, "Verbinde mit API...")
+            stats = {}
+            search_ids = {} # (keyword, country) -> search row, created with its first lead
+            found = []
+            
+            def search_for(pair):
+                if pair not in search_ids:
+                    search_ids[pair] = db.create_search(st.session_state.user_id, pair[0], pair[1])
+                return search_ids[pair]
             
-            if not df.empty:
-                if "Ad URL" in df.columns:
-                     df["Ad URL"] = df["Ad URL"].apply(lambda x: f"{x}&country={country}" if "?" in str(x) else f"{x}?country={country}")
+            # Stream leads: each one is saved & shown as soon as its crawl is done.
+            # Shops the user already has are skipped before the crawl.
+            known_domains = db.get_known_domains(st.session_state.user_id)
+            for lead in iter_leads(queries=queries, max_results=max_results, stats=stats, known_domains=known_domains):
+                country = lead["Country"]
+                if lead.get("Ad URL"):
+                    lead["Ad URL"] = f"{lead['Ad URL']}&country={country}" if "?" in str(lead["Ad URL"]) else f"{lead['Ad URL']}?country={country}"
                 
-                db.save_search_results(st.session_state.user_id, keyword, country, df)
+                db.save_lead(st.session_state.user_id, search_for((lead["Keyword"], country)), lead)
+                found.append(lead)
                 
-                # Auto-Sync to Sheets after search
-                sheets.sync_sqlite_to_sheets()
+                done, total = stats["processed"], max(stats["queued"], 1)
+                bar.progress(10 + int(90 * done / total), f"Analysiere Webseiten... ({done}/{stats['queued']})")
+                live_table.dataframe(pd.DataFrame(found), use_container_width=True)
+            
+            # Shops found again (known or by another search of the batch): link the existing leads
+            links = {}
+            for website, link_keyword, link_country in stats.get("links", []):
+                links.setdefault((link_keyword, link_country), []).append(website)
+            for pair, websites in links.items():
+                db.link_known_leads(st.session_state.user_id, search_for(pair), websites)
+            if stats.get("known"):
+                st.info(f"♻️ {stats['known']} bereits bekannte Shops übersprungen (mit der Suche verknüpft).")
+            
+            if found:
+                # Auto-Sync to Sheets after search (background)
+                sync_worker.request_sync()
                 
                 bar.progress(100, "Fertig!")
-                st.success(f"✅ {len(df)} Leads gefunden!")
-                st.dataframe(df, use_container_width=True)
+                st.success(f"✅ {len(found)} Leads gefunden!")
             else:
                 bar.progress(100, "Fertig!")
                 st.warning("Keine Ergebnisse gefunden.")
@@ -420,16 +466,15 @@ elif page == "Neue Suche":
 elif page == "CRM & Leads":
     st.title("CRM & Leads")
     
-    df_leads = db.get_user_leads(st.session_state.user_id)
+    uid = st.session_state.user_id
     
-    if not df_leads.empty:
+    if db.count_user_leads(uid) > 0:
+        # Filter options come from the searches table, not from loading every lead
+        available_cats, available_kws = db.get_lead_filter_options(uid)
+        
         # Determine default category index from Session State
         default_cat_index = 0
-        categories = ["Alle"]
-        available_cats = []
-        if "Category" in df_leads.columns:
-            available_cats = [x for x in df_leads["Category"].unique() if x]
-            categories += available_cats
+        categories = ["Alle"] + list(available_cats)
             
         if "target_category" in st.session_state and st.session_state.target_category in categories:
             default_cat_index = categories.index(st.session_state.target_category)
@@ -438,36 +483,46 @@ elif page == "CRM & Leads":
             
         # Filter Bar
         st.markdown('<div class="stCard">', unsafe_allow_html=True)
+        search_query = st.text_input("🔍 Suche", placeholder="Firma, Domain, E-Mail oder Notiz...").strip()
         c1, c2, c3 = st.columns([1, 1, 2])
         
         # Category Filter
         sel_cat = c1.selectbox("Kategorie Filter", categories, index=default_cat_index)
         
-        # Keyword Filter
-        keywords = ["Alle"]
-        if "Keyword" in df_leads.columns:
-            # Sort unique keywords alphabetically, ignoring nulls
-            unique_kws = sorted([x for x in df_leads["Keyword"].unique() if x and str(x).strip() != ""])
-            keywords += unique_kws
-            
+        # Keyword Filter (alphabetical, sorted in SQL)
+        keywords = ["Alle"] + list(available_kws)
         sel_kw = c2.selectbox("Keyword Filter", keywords)
         
-        filtered_df = df_leads.copy()
+        # Filtering, sorting and paging run in SQL: only the visible page is loaded
+        cat_filter = None if sel_cat == "Alle" else sel_cat
+        kw_filter = None if sel_kw == "Alle" else sel_kw
+        
+        p1, p2 = c3.columns(2)
+        page_size = p1.selectbox("Leads pro Seite", [50, 100, 250, 500], index=1)
         
-        # Apply Category Filter
-        if sel_cat != "Alle":
-            filtered_df = filtered_df[filtered_df["Category"] == sel_cat]
+        if search_query:
+            # Full-text search: best matches first, limited to one page
+            page_no = 1
+            filtered_df = db.search_leads(uid, search_query, keyword=kw_filter, category=cat_filter, limit=page_size)
+            st.caption(f"{len(filtered_df)} Treffer für „{search_query}“")
+        else:
+            total = db.count_user_leads(uid, keyword=kw_filter, category=cat_filter)
+            num_pages = max(1, -(-total // page_size))
+            page_no = p2.number_input(f"Seite (von {num_pages})", min_value=1, max_value=num_pages, value=1, step=1)
             
-        # Apply Keyword Filter
-        if sel_kw != "Alle":
-            filtered_df = filtered_df[filtered_df["Keyword"] == sel_kw]
+            filtered_df = db.get_user_leads(
+                uid, keyword=kw_filter, category=cat_filter,
+                limit=page_size, offset=(page_no - 1) * page_size
+            )
+            st.caption(f"{total} Leads")
             
         st.markdown('</div>', unsafe_allow_html=True)
             
         st.markdown('<div class="stCard">', unsafe_allow_html=True)
+        editor_key = f"crm_editor_{sel_cat}_{sel_kw}_{page_size}_{page_no}_{search_query}"
         edited_df = st.data_editor(
             filtered_df,
-            key="crm_editor",
+            key=editor_key,
             use_container_width=True,
             column_config={
                 "ID": None,
@@ -488,23 +543,15 @@ elif page == "CRM & Leads":
             disabled=["Company", "Email", "Keyword", "Date", "Website", "Ad URL", "Ad Image", "Category"]
         )
         st.markdown('</div>', unsafe_allow_html=True)
-        if "crm_editor" in st.session_state:
-            changes = st.session_state.crm_editor.get("edited_rows", {})
+        if editor_key in st.session_state:
+            changes = st.session_state[editor_key].get("edited_rows", {})
             
-            # Application of standard changes (excluding Trash for now)
-            for idx, updates in changes.items():
-                if "Trash" in updates: 
-                    continue # Handle Trash separately
-                try:
-                    real_row = filtered_df.loc[int(idx)]
-                    lead_id = real_row["ID"]
-                    for col, val in updates.items():
-                         db.update_lead(lead_id, col, val)
-                except:
-                    pass
+            # Application of standard changes (excluding Trash for now), one batch
+            db.update_leads(collect_edits(filtered_df, {idx: u for idx, u in changes.items() if "Trash" not in u}))
             
-            # Sync to Sheets after edits
-            sheets.sync_sqlite_to_sheets()
+            # Sync to Sheets after edits (background, coalesced)
+            if changes:
+                sync_worker.request_sync()
 
             # Force reload to persist changes in UI immediately
             
@@ -513,23 +560,18 @@ elif page == "CRM & Leads":
                 st.rerun()
 
         # Batch Delete Action
-        trash_indices = [idx for idx, updates in st.session_state.get("crm_editor", {}).get("edited_rows", {}).items() if updates.get("Trash")]
+        trash_indices = [idx for idx, updates in st.session_state.get(editor_key, {}).get("edited_rows", {}).items() if updates.get("Trash")]
         
         if trash_indices:
             st.warning(f"⚠️ Du hast {len(trash_indices)} Leads zum Löschen markiert.")
             if st.button(f"🗑️ {len(trash_indices)} Leads endgültig löschen", type="primary"):
-                for idx in trash_indices:
-                    try:
-                        real_row = filtered_df.loc[int(idx)]
-                        db.update_lead(real_row["ID"], "Trash", True)
-                    except:
-                        pass
+                db.update_leads(collect_edits(filtered_df, {idx: {"Trash": True} for idx in trash_indices}))
                 
-                # Sync after delete
-                sheets.sync_sqlite_to_sheets()
+                # Sync after delete (background)
+                sync_worker.request_sync()
                 
                 # Reset Editor State
-                del st.session_state.crm_editor
+                del st.session_state[editor_key]
                 st.success("Leads gelöscht!")
                 st.rerun()
     else:
@@ -539,27 +581,16 @@ elif page == "Wiedervorlage":
     st.title("📅 Wiedervorlage & Aufgaben")
     st.info("Hier landen Leads, die du zur Prüfung markiert hast (z.B. nach Newsletter-Anmeldung).")
     
-    # 1. Fetch Follow-ups
-    df_all = db.get_user_leads(st.session_state.user_id)
+    # 1. Fetch pending follow-ups (filtered, sorted and counted in SQL)
+    uid = st.session_state.user_id
     
-    if not df_all.empty and "Wiedervorlage" in df_all.columns:
-        # Filter for pending tasks
-        # Ensure Status column exists (migration script added it)
-        # We filter where 'Wiedervorlage' is set AND Status is NOT 'completed'
-        # Note: SQLite might return None for Status if default missing, but we set default 'pending'.
-        
-        # Safe filtering
-        mask_pending = (df_all["Wiedervorlage"].notna()) & (df_all["Wiedervorlage"] != "") & (df_all["Status"] != "completed")
-        df_tasks = df_all[mask_pending].copy()
+    if db.count_user_leads(uid) > 0:
+        # Oldest due date first = overdue on top
+        df_tasks = db.get_follow_ups(uid)
         
-        # Sort by Date (oldest first = overdue)
         if not df_tasks.empty:
-            df_tasks = df_tasks.sort_values(by="Wiedervorlage")
-            
             # Metrics
-            today_str = datetime.now().strftime('%Y-%m-%d')
-            count_total = len(df_tasks)
-            count_overdue = len(df_tasks[df_tasks["Wiedervorlage"] < today_str])
+            count_total, count_overdue = db.count_follow_ups(uid)
             
             m1, m2 = st.columns(2)
             m1.metric("Offene Aufgaben", count_total)
@@ -598,36 +629,24 @@ elif page == "Wiedervorlage":
             if "tasks_editor" in st.session_state:
                 changes = st.session_state.tasks_editor.get("edited_rows", {})
                 
-                dirty = False
-                for idx, updates in changes.items():
-                    try:
-                        # Use .loc for safety as per previous fix
-                        real_row = df_tasks.loc[int(idx)]
-                        lead_id = real_row["ID"]
-                        
-                        if "Erledigt" in updates and updates["Erledigt"] is True:
-                            # Mark as completed
-                            # We can use update_lead generic logic or sql directly?
-                            # update_lead maps 'Kunde' etc. but 'follow_up_status' is raw?
-                            # We need to use update_lead but add handling for 'follow_up_status' in db tool?
-                            # OR just use a specialized call?
-                            # Let's add 'Status' handling to update_lead in database.py? 
-                            # Wait, usually I prefer raw SQL updates for non-standard columns if update_lead is strict.
-                            # But I can abuse update_lead if I pass the column name directly?
-                            # database.py uses `db_col = ... .get(column, column)`. So existing names works!
-                            db.update_lead(lead_id, "follow_up_status", "completed")
-                            dirty = True
-                            
-                        # Handle date changes
-                        if "Wiedervorlage" in updates:
-                             db.update_lead(lead_id, "follow_up_date", updates["Wiedervorlage"])
-                             
-                        # Handle Note changes
-                        if "Notizen" in updates:
-                             db.update_lead(lead_id, "Notizen", updates["Notizen"])
-                             
-                    except Exception as e:
-                        print(e)
+                # Map task editor columns to lead columns and save in one batch
+                task_edits = {}
+                for lead_id, updates in collect_edits(df_tasks, changes).items():
+                    cells = {}
+                    if updates.get("Erledigt") is True:
+                        cells["follow_up_status"] = "completed"
+                    if "Wiedervorlage" in updates:
+                        cells["follow_up_date"] = updates["Wiedervorlage"]
+                    if "Notizen" in updates:
+                        cells["Notizen"] = updates["Notizen"]
+                    if cells:
+                        task_edits[lead_id] = cells
+                
+                result = db.update_leads(task_edits)
+                dirty = any(u.get("Erledigt") is True for u in changes.values()) and not result["error"]
+                
+                if task_edits:
+                    sync_worker.request_sync()
                 
                 if dirty:
                     st.success("Aufgaben aktualisiert!")
@@ -700,9 +719,10 @@ elif page == "Kategorien":
             st.markdown('</div>', unsafe_allow_html=True)
             
             # 2b. Show Leads for this Search
-            user_leads = db.get_user_leads(st.session_state.user_id)
+            # Keyword filter runs in SQL (cached per user & keyword)
+            user_leads = db.get_user_leads(st.session_state.user_id, keyword=keyword)
             if not user_leads.empty:
-                search_leads = user_leads[user_leads["Keyword"] == keyword]
+                search_leads = user_leads
                 
                 if not search_leads.empty:
                     st.markdown(f"#### Gefundene Leads ({len(search_leads)})")
@@ -735,12 +755,8 @@ elif page == "Kategorien":
                          if trash_indices:
                              st.warning(f"⚠️ {len(trash_indices)} Leads markiert.")
                              if st.button(f"🗑️ Löschen", key=f"del_btn_detail_{search_id}", type="primary"):
-                                 for idx in trash_indices:
-                                     try:
-                                         real_row = search_leads.loc[int(idx)]
-                                         db.update_lead(real_row["ID"], "Trash", True)
-                                     except:
-                                         pass
+                                 db.update_leads(collect_edits(search_leads, {idx: {"Trash": True} for idx in trash_indices}))
+                                 sync_worker.request_sync()
                                  
                                  if f"leads_editor_{search_id}" in st.session_state:
                                      del st.session_state[f"leads_editor_{search_id}"]
@@ -787,21 +803,14 @@ elif page == "Papierkorb":
         
         if "trash_editor" in st.session_state:
             changes = st.session_state.trash_editor.get("edited_rows", {})
-            for idx, updates in changes.items():
-                try:
-                    real_row = df_deleted.loc[int(idx)]
-                    lead_id = real_row["ID"]
-                    for col, val in updates.items():
-                        # Map friendly names if needed or rely on db logic
-                        # 'Trash' -> 'deleted' handled in update_lead
-                        # 'Grund' -> 'deletion_reason' handled in update_lead
-                        db.update_lead(lead_id, col, val)
-                        
-                    # If Trash status changed (uncheck), rerun to move it back to active
-                    if "Trash" in updates:
-                        st.balloons() # Nice touch for restoring
-                        st.rerun()
-                except:
-                    pass
+            # 'Trash' -> 'deleted' and 'Grund' -> 'deletion_reason' are mapped in update_leads
+            if changes:
+                db.update_leads(collect_edits(df_deleted, changes))
+                sync_worker.request_sync()
+                
+            # If Trash status changed (uncheck), rerun to move it back to active
+            if any("Trash" in updates for updates in changes.values()):
+                st.balloons() # Nice touch for restoring
+                st.rerun()
     else:
         st.info("Der Papierkorb ist leer. Alles sauber! 🧹")
@@ -0,0 +1,223 @@
+import gzip
+import hashlib
+import itertools
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+ARCHIVE_DIR = "ad_archive" # Lives next to leads.db
+
+SEGMENT_SIZE = 64 * 1024 * 1024 # Start a new segment file after ~64 MB (compressed)
+
+# Tags added by MetaClient, not part of the raw Apify payload
+SEARCH_TAGS = ("searchKeyword", "searchCountry", "searchRunId")
+
+class AdArchive:
+    """
+    Append-only archive of raw Apify ad payloads, so extraction can be
+    re-run offline instead of paying for the same search again.
+
+    Payloads are content-addressed (sha256 of the canonical JSON) and stored
+    once, each as its own gzip member appended to a segment file
+    (segments/seg-000001.jsonl.gz ...). A segment is therefore a plain
+    multi-member .jsonl.gz and every payload can also be read on its own via
+    (segment, offset, length). The SQLite index maps ad archive ID + search
+    (keyword, country, Apify run) to the payload hash.
+    """
+    def __init__(self, root=ARCHIVE_DIR, segment_size=SEGMENT_SIZE):
+        self.root = root
+        self.segment_size = segment_size
+        self.commit_every = 100 # Index commit interval (puts)
+        self._pending = 0
+        os.makedirs(os.path.join(root, "segments"), exist_ok=True)
+
+        # One writer at a time (the ad stream runs in the crawl feeder thread)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(root, "index.db"), check_same_thread=False)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS blobs (
+                sha256 TEXT PRIMARY KEY,
+                segment INTEGER NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                raw_size INTEGER NOT NULL
+            )
+        ''')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS ads (
+                ad_id TEXT NOT NULL,
+                keyword TEXT,
+                country TEXT,
+                run_id TEXT,
+                sha256 TEXT NOT NULL,
+                archived_at REAL NOT NULL,
+                UNIQUE (ad_id, keyword, country, sha256)
+            )
+        ''')
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_ads_search ON ads(keyword, country)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_ads_run ON ads(run_id)")
+        self._conn.commit()
+
+        row = self._conn.execute("SELECT MAX(segment) FROM blobs").fetchone()
+        self._segment = row[0] or 1
+
+    def _segment_path(self, segment):
+        return os.path.join(self.root, "segments", f"seg-{segment:06d}.jsonl.gz")
+
+    def put(self, ad):
+        """
+        Archives one ad (search tags are stored in the index, not the payload).
+        Returns its sha256; payloads already in the archive aren't written again.
+        """
+        payload = {k: v for k, v in ad.items() if k not in SEARCH_TAGS}
+        raw = (json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False) + "\n").encode("utf-8")
+        sha = hashlib.sha256(raw).hexdigest()
+        ad_id = str(ad.get("adArchiveID") or ad.get("adArchiveId") or ad.get("ad_archive_id") or sha)
+
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM blobs WHERE sha256 = ?", (sha,)).fetchone() is None:
+                # Blob first, index second: a crash in between only leaves unreferenced bytes
+                member = gzip.compress(raw)
+                path = self._segment_path(self._segment)
+                if os.path.exists(path) and os.path.getsize(path) + len(member) > self.segment_size:
+                    self._segment += 1
+                    path = self._segment_path(self._segment)
+                with open(path, "ab") as f:
+                    offset = f.tell()
+                    f.write(member)
+                self._conn.execute(
+                    "INSERT INTO blobs (sha256, segment, offset, length, raw_size) VALUES (?, ?, ?, ?, ?)",
+                    (sha, self._segment, offset, len(member), len(raw))
+                )
+            self._conn.execute(
+                "INSERT OR IGNORE INTO ads (ad_id, keyword, country, run_id, sha256, archived_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (ad_id, ad.get("searchKeyword"), ad.get("searchCountry"), ad.get("searchRunId"), sha, time.time())
+            )
+            self._pending += 1
+            if self._pending >= self.commit_every:
+                self._conn.commit()
+                self._pending = 0
+        return sha
+
+    def record(self, ads):
+        """Pass-through generator: archives every ad of a stream, then yields it."""
+        for ad in ads:
+            self.put(ad)
+            yield ad
+        self.flush()
+
+    def record_batches(self, batches):
+        """Like record(), for a stream of ad lists (MetaClient.stream_ads(batches=True))."""
+        for batch in batches:
+            for ad in batch:
+                self.put(ad)
+            yield batch
+        self.flush()
+
+    def get(self, sha):
+        """Returns one archived payload by hash (None if unknown)."""
+        with self._lock:
+            row = self._conn.execute("SELECT segment, offset, length FROM blobs WHERE sha256 = ?", (sha,)).fetchone()
+        if row is None:
+            return None
+        with open(self._segment_path(row[0]), "rb") as f:
+            f.seek(row[1])
+            return json.loads(gzip.decompress(f.read(row[2])))
+
+    def iter_ads(self, keyword=None, country=None, run_id=None, batch_size=None):
+        """
+        Replays archived ads (optionally of one search or run), tagged like
+        MetaClient does. Reads in segment order, each segment file opened
+        once, so a replay runs at disk speed without any network call.
+        With batch_size set, yields lists of up to batch_size ads instead.
+        """
+        if batch_size:
+            ads = self.iter_ads(keyword, country, run_id)
+            while True:
+                batch = list(itertools.islice(ads, batch_size))
+                if not batch:
+                    return
+                yield batch
+
+        where, params = [], []
+        for column, value in (("a.keyword", keyword), ("a.country", country), ("a.run_id", run_id)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        query = '''
+            SELECT a.keyword, a.country, a.run_id, b.segment, b.offset, b.length
+            FROM ads a JOIN blobs b ON b.sha256 = a.sha256
+        '''
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY b.segment, b.offset"
+        with self._lock:
+            self._conn.commit() # Make pending puts visible
+            rows = self._conn.execute(query, params).fetchall()
+
+        f, open_segment = None, None
+        try:
+            for kw, ctry, run, segment, offset, length in rows:
+                if segment != open_segment:
+                    if f:
+                        f.close()
+                    f, open_segment = open(self._segment_path(segment), "rb"), segment
+                f.seek(offset)
+                ad = json.loads(gzip.decompress(f.read(length)))
+                ad["searchKeyword"], ad["searchCountry"], ad["searchRunId"] = kw, ctry, run
+                yield ad
+        finally:
+            if f:
+                f.close()
+
+    def searches(self):
+        """(keyword, country, number of ads) of everything archived."""
+        with self._lock:
+            self._conn.commit()
+            return self._conn.execute(
+                "SELECT keyword, country, COUNT(*) FROM ads GROUP BY keyword, country ORDER BY keyword, country"
+            ).fetchall()
+
+    def stats(self):
+        with self._lock:
+            self._conn.commit()
+            ads = self._conn.execute("SELECT COUNT(*) FROM ads").fetchone()[0]
+            blobs, raw, stored = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(raw_size), 0), COALESCE(SUM(length), 0) FROM blobs"
+            ).fetchone()
+        return {
+            "ads": ads,
+            "payloads": blobs,
+            "raw_bytes": raw,
+            "stored_bytes": stored,
+            "ratio": round(raw / stored, 2) if stored else 0.0
+        }
+
+    def flush(self):
+        with self._lock:
+            self._conn.commit()
+            self._pending = 0
+
+    def close(self):
+        self.flush()
+        self._conn.close()
+
+if __name__ == "__main__":
+    # python -m tools.ad_archive                    -> archive overview
+    # python -m tools.ad_archive replay <keyword> [country]  -> offline extraction
+    archive = AdArchive()
+    if len(sys.argv) > 2 and sys.argv[1] == "replay":
+        from tools.orchestrator import replay_extraction
+        started = time.perf_counter()
+        df, stats = replay_extraction(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None, archive=archive)
+        print(df.head(20).to_string())
+        stats.pop("links")
+        print(f"⏱️ {stats['fetched']} ads -> {len(df)} leads in {time.perf_counter() - started:.2f}s: {stats}")
+    else:
+        for keyword, country, count in archive.searches():
+            print(f"{keyword} ({country}): {count} ads")
+        print(archive.stats())
+    archive.close()
@@ -0,0 +1,201 @@
+import re
+import pandas as pd
+from tools.domains import normalize_domain
+
+# Ads pointing to these hosts have no shop website
+SOCIAL_DOMAINS = ["facebook.com", "instagram.com"]
+
+# First http(s) URL in an ad text (fallback when the ad has no link)
+URL_IN_TEXT = r'(https?://[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})'
+
+# Host part of a URL or bare domain: optional scheme and credentials, stops at port/path/query
+HOST_PATTERN = r'^(?:[a-zA-Z][a-zA-Z0-9+.-]*://)?(?:[^/?#]*@)?([^/?#:]*)'
+
+FRAME_COLUMNS = ["Company", "Website", "Domain", "Ad URL", "Ad Image", "Keyword", "Country"]
+LEAD_COLUMNS = ["Company", "Website", "Ad URL", "Ad Image", "Keyword", "Country"]
+
+# Below this many ads per batch the per-ad loop is faster (pandas has a
+# fixed cost per batch); live dataset pages are ~100 ads, replay batches 5000
+COLUMNAR_MIN_BATCH = 5000
+
+def extract_batch(ads, stats, known_domains=None, seen=None):
+    """
+    Lead dicts (Email still None) of one batch of raw Apify ads, after the
+    filter & dedup of select_candidates. Large batches go through the
+    columnar frame, small ones through the equivalent per-ad loop.
+    """
+    if len(ads) >= COLUMNAR_MIN_BATCH:
+        return candidate_leads(select_candidates(extract_ads_frame(ads), stats, known_domains, seen))
+    return iter_candidates(ads, stats, known_domains, seen)
+
+def _raw_fields(ad):
+    """(company, link, card link, image, card image, body text, ad URL, keyword, country) of one ad."""
+    snapshot = ad.get("snapshot") or {}
+    cards = snapshot.get("cards") or []
+    card = cards[0] if isinstance(cards, list) and cards else {}
+    image_list = snapshot.get("images") or []
+    image = image_list[0] if image_list else {}
+
+    link = snapshot.get("linkUrl") or snapshot.get("link_url") or None
+    card_link = card.get("linkUrl") or card.get("link_url") or None
+
+    # Body text is only needed for ads without any link
+    text = None
+    if not (link or card_link):
+        body = snapshot.get("body", {})
+        body_text = body.get("text", "") if isinstance(body, dict) else str(body)
+        # Some scrapers put body directly as string in 'body' or 'title'
+        text = body_text or snapshot.get("title", "") or ad.get("ad_creative_body", "")
+
+    return (
+        snapshot.get("pageName") or snapshot.get("page_name") or ad.get("pageName") or ad.get("page_name") or None,
+        link,
+        card_link,
+        image.get("original_image_url") or image.get("resized_image_url") or None,
+        card.get("original_image_url") or card.get("resized_image_url") or None,
+        text,
+        ad.get("ad_archive_url") or ad.get("adArchiveUrl") or ad.get("snapshotUrl") or ad.get("ad_library_url") or None,
+        ad.get("searchKeyword"),
+        ad.get("searchCountry")
+    )
+
+def iter_candidates(ads, stats, known_domains=None, seen=None):
+    """Per-ad version of select_candidates(extract_ads_frame(ads)) + candidate_leads, same leads and counters."""
+    seen = {} if seen is None else seen
+    known_domains = known_domains or set()
+    for ad in ads:
+        company, link, card_link, image, card_image, text, ad_url, keyword, country = _raw_fields(ad)
+        stats["fetched"] += 1
+
+        # Website priority: CTA link > first card link > first URL in the ad text
+        website = link or card_link
+        if website is None and isinstance(text, str):
+            match = re.search(URL_IN_TEXT, text)
+            website = match.group(1) if match else None
+        website = str(website) if website is not None else None
+        domain = normalize_domain(website)
+        if not domain or domain in SOCIAL_DOMAINS:
+            stats["no_website"] += 1
+            continue
+
+        source = (keyword, country)
+        if domain in seen:
+            stats["duplicates"] += 1
+            if seen[domain] != source:
+                stats["links"].append((website, keyword, country))
+            continue
+        seen[domain] = source
+
+        if domain in known_domains:
+            stats["known"] += 1
+            stats["links"].append((website, keyword, country))
+            continue
+
+        stats["queued"] += 1
+        yield {
+            "Company": company or "Unknown",
+            "Website": website,
+            "Email": None, # Filled in by the crawl
+            "Ad URL": ad_url,
+            "Ad Image": image or card_image,
+            "Keyword": keyword,
+            "Country": country
+        }
+
+def extract_ads_frame(ads):
+    """
+    Normalizes a batch of raw Apify items into one row per ad:
+    Company, Website, Domain, Ad URL, Ad Image, Keyword, Country.
+
+    A single pass collects the raw fields into columns; the fallbacks
+    (cards, body text), URL cleanup and domain normalization then run as
+    column operations instead of per ad.
+    """
+    rows = [_raw_fields(ad) for ad in ads]
+    if not rows:
+        return pd.DataFrame(columns=FRAME_COLUMNS)
+    names, links, card_links, images, card_images, texts, ad_urls, keywords, countries = map(list, zip(*rows))
+
+    frame = pd.DataFrame({
+        "Company": names, "Website": links, "Domain": None, "Ad URL": ad_urls, "Ad Image": images,
+        "Keyword": keywords, "Country": countries
+    }, dtype=object)
+    frame["Company"] = frame["Company"].fillna("Unknown")
+    frame["Ad Image"] = frame["Ad Image"].fillna(pd.Series(card_images, dtype=object))
+
+    # Website priority: CTA link > first card link > first URL in the ad text
+    website = frame["Website"].fillna(pd.Series(card_links, dtype=object))
+    missing = website.isna()
+    if missing.any():
+        website[missing] = pd.Series(texts, dtype=object)[missing].str.extract(URL_IN_TEXT, expand=False)
+    frame["Website"] = website.where(website.isna(), website.astype(str))
+
+    # Ads of one shop share their URL: normalize each distinct URL once
+    urls = frame["Website"].dropna().unique()
+    frame["Domain"] = frame["Website"].map(dict(zip(urls, normalize_domains(urls))))
+    return frame
+
+def normalize_domains(urls):
+    """Column version of tools.domains.normalize_domain ('https://www.Shop.de/x' -> 'shop.de')."""
+    urls = pd.Series(urls, dtype=object)
+    host = (
+        urls.str.strip()
+        .str.extract(HOST_PATTERN, expand=False)
+        .str.lower()
+        .str.strip(".")
+        .str.replace(r"^www\.", "", regex=True)
+    )
+    return host.where(host.notna() & (host != ""), None).tolist()
+
+def select_candidates(frame, stats, known_domains=None, seen=None):
+    """
+    Vectorized filter & dedup before any crawl: drops ads without a shop
+    website (none / social), duplicates (within the batch and against
+    `seen`, domain -> (keyword, country) of earlier batches) and shops in
+    `known_domains`. Updates the counters in `stats` like iter_leads expects.
+    Returns the rows to crawl.
+    """
+    seen = {} if seen is None else seen
+    stats["fetched"] += len(frame)
+    if frame.empty:
+        return frame
+
+    has_site = frame["Domain"].notna() & ~frame["Domain"].isin(SOCIAL_DOMAINS)
+    stats["no_website"] += int((~has_site).sum())
+    frame = frame[has_site]
+
+    # Duplicates: a domain already queued by an earlier batch or earlier in this batch.
+    # Lookups go through the batch's domains, so `seen` is never copied per batch.
+    domains = frame["Domain"]
+    duplicate = domains.map(seen.__contains__) | domains.duplicated()
+    firsts, dups = frame[~duplicate], frame[duplicate]
+    stats["duplicates"] += int(duplicate.sum())
+    seen.update(zip(firsts["Domain"], zip(firsts["Keyword"], firsts["Country"])))
+
+    # Same shop found by another search of the batch: link it to that search too
+    for website, keyword, country, first in zip(dups["Website"], dups["Keyword"], dups["Country"], dups["Domain"].map(seen.get)):
+        if (keyword, country) != first:
+            stats["links"].append((website, keyword, country))
+
+    # Already a lead from an earlier search: link instead of crawling
+    known = firsts["Domain"].map((known_domains or set()).__contains__).astype(bool)
+    stats["known"] += int(known.sum())
+    stats["links"] += list(zip(firsts["Website"][known], firsts["Keyword"][known], firsts["Country"][known]))
+
+    candidates = firsts[~known]
+    stats["queued"] += len(candidates)
+    return candidates
+
+def candidate_leads(frame):
+    """Lead dicts (Email still None) for the rows select_candidates kept."""
+    columns = [frame[c].where(frame[c].notna(), None).tolist() for c in LEAD_COLUMNS]
+    for company, website, ad_url, image, keyword, country in zip(*columns):
+        yield {
+            "Company": company,
+            "Website": website,
+            "Email": None, # Filled in by the crawl
+            "Ad URL": ad_url,
+            "Ad Image": image,
+            "Keyword": keyword,
+            "Country": country
+        }
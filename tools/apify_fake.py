@@ -0,0 +1,145 @@
+import copy
+import itertools
+import json
+import os
+import re
+import urllib.parse
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "schema_sample.json")
+
+class FakeApifyClient:
+    """
+    In-memory stand-in for apify_client.ApifyClient (the subset MetaClient
+    uses). Runs "scrape" `items_per_poll` ads per status poll, so streaming
+    and resuming can be tested offline:
+
+        client = FakeApifyClient(ads_per_run=30, items_per_poll=10)
+        for ad in MetaClient(client=client).stream_ads([("skincare", "DE")], poll_interval=0):
+            ...
+        print(client.calls)
+
+    Ads are copies of schema_sample.json with a unique page name, link and
+    archive ID per keyword. Keywords in `fail_keywords` end with FAILED.
+    """
+    def __init__(self, ads_per_run=20, items_per_poll=5, fail_keywords=()):
+        self.ads_per_run = ads_per_run
+        self.items_per_poll = items_per_poll
+        self.fail_keywords = set(fail_keywords)
+        self.runs = {} # run id -> run dict (incl. the ads it will produce)
+        self.datasets = {} # dataset id -> items scraped so far
+        self.calls = {}
+        self._ids = itertools.count(1)
+        self._template = _load_template()
+
+    def _count(self, name):
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def actor(self, actor_id):
+        return _FakeActor(self, actor_id)
+
+    def run(self, run_id):
+        return _FakeRun(self, run_id)
+
+    def dataset(self, dataset_id):
+        return _FakeDataset(self, dataset_id)
+
+    def _start(self, run_input):
+        self._count("start")
+        n = next(self._ids)
+        run = {"id": f"run{n}", "defaultDatasetId": f"dataset{n}", "status": "RUNNING", "pending": []}
+        for entry in run_input.get("urls", []):
+            query = urllib.parse.parse_qs(urllib.parse.urlparse(entry["url"]).query)
+            keyword = query.get("q", [""])[0]
+            count = min(self.ads_per_run, run_input.get("count") or self.ads_per_run)
+            run["pending"] += [self._ad(keyword, i) for i in range(count)]
+            if keyword in self.fail_keywords:
+                run["fail"] = True
+        self.runs[run["id"]] = run
+        self.datasets[run["defaultDatasetId"]] = []
+        return self._public(run)
+
+    def _advance(self, run):
+        """One poll: the actor scrapes the next few ads (or finishes)."""
+        if run["status"] != "RUNNING":
+            return
+        batch, run["pending"] = run["pending"][:self.items_per_poll], run["pending"][self.items_per_poll:]
+        self.datasets[run["defaultDatasetId"]].extend(batch)
+        if not run["pending"]:
+            run["status"] = "FAILED" if run.get("fail") else "SUCCEEDED"
+
+    def _ad(self, keyword, i):
+        slug = re.sub(r"[^a-z0-9]+", "-", keyword.lower()).strip("-") or "shop"
+        ad = copy.deepcopy(self._template)
+        ad["adArchiveID"] = ad["adArchiveId"] = f"{slug}-{i}"
+        ad["pageName"] = f"{keyword} Shop {i}"
+        snapshot = ad.setdefault("snapshot", {})
+        snapshot["pageName"] = snapshot["page_name"] = f"{keyword} Shop {i}"
+        snapshot["linkUrl"] = snapshot["link_url"] = f"https://{slug}-{i}.example.com/"
+        return ad
+
+    @staticmethod
+    def _public(run):
+        return {k: v for k, v in run.items() if k not in ("pending", "fail")}
+
+class _FakeActor:
+    def __init__(self, client, actor_id):
+        self.client = client
+        self.actor_id = actor_id
+
+    def start(self, run_input=None, **kwargs):
+        return self.client._start(run_input or {})
+
+    def call(self, run_input=None, **kwargs):
+        run = self.client._start(run_input or {})
+        return self.client.run(run["id"]).wait_for_finish()
+
+class _FakeRun:
+    def __init__(self, client, run_id):
+        self.client = client
+        self.run_id = run_id
+
+    def get(self):
+        self.client._count("run.get")
+        run = self.client.runs.get(self.run_id)
+        if run is None:
+            return None
+        self.client._advance(run)
+        return self.client._public(run)
+
+    def wait_for_finish(self, **kwargs):
+        run = self.client.runs[self.run_id]
+        while run["status"] == "RUNNING":
+            self.client._advance(run)
+        return self.client._public(run)
+
+class _FakeDataset:
+    def __init__(self, client, dataset_id):
+        self.client = client
+        self.dataset_id = dataset_id
+
+    def list_items(self, offset=0, limit=None, **kwargs):
+        self.client._count("list_items")
+        items = self.client.datasets[self.dataset_id]
+        end = len(items) if limit is None else offset + limit
+        return ListPage(copy.deepcopy(items[offset:end]), offset, limit, len(items))
+
+    def iterate_items(self, **kwargs):
+        self.client._count("iterate_items")
+        for item in self.client.datasets[self.dataset_id]:
+            yield copy.deepcopy(item)
+
+class ListPage:
+    """Mirrors apify_client's ListPage (items, offset, limit, count, total)."""
+    def __init__(self, items, offset, limit, total):
+        self.items = items
+        self.offset = offset
+        self.limit = limit
+        self.count = len(items)
+        self.total = total
+
+def _load_template():
+    try:
+        with open(SAMPLE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"snapshot": {}}
@@ -0,0 +1,155 @@
+import copy
+import json
+import random
+import sys
+import time
+from tools.ad_extraction import candidate_leads, extract_ads_frame, extract_batch, iter_candidates, normalize_domains, select_candidates
+from tools.apify_fake import SAMPLE_FILE
+from tools.domains import normalize_domain
+from tools.orchestrator import REPLAY_BATCH_SIZE, extract_domain
+
+# python -m tools.bench_extraction [ads] [batch size]
+# Compares the previous per-ad extraction loop with the vectorized batch
+# stage and with extract_batch (what the pipeline runs: per ad below
+# COLUMNAR_MIN_BATCH, vectorized above) on synthetic ads built from
+# schema_sample.json.
+
+def synthetic_ads(n, seed=42):
+    """n ads with the shapes seen in real runs: CTA link, card link, link only in the text, social, duplicate shop, none."""
+    with open(SAMPLE_FILE) as f:
+        template = json.load(f)
+    rng = random.Random(seed)
+    ads = []
+    for i in range(n):
+        ad = copy.deepcopy(template)
+        snapshot = ad["snapshot"]
+        shop = rng.randrange(max(n // 3, 1)) # ~1/3 unique shops -> many duplicates
+        url = rng.choice(["https://www.shop{}.de/produkte?utm_source=fb", "http://Shop{}.com", "shop{}.de/"]).format(shop)
+        snapshot["pageName"] = f"Shop {shop}"
+        snapshot["linkUrl"] = snapshot["link_url"] = None
+        snapshot["cards"] = []
+        snapshot["body"] = {"text": "Jetzt entdecken!"}
+
+        kind = rng.random()
+        if kind < 0.55:
+            snapshot["linkUrl"] = url
+        elif kind < 0.7:
+            snapshot["cards"] = [{"linkUrl": url, "original_image_url": f"https://img.example/{i}.jpg"}]
+        elif kind < 0.8:
+            snapshot["body"] = {"text": f"Mehr auf https://www.textshop{shop}.de - jetzt!"}
+        elif kind < 0.9:
+            snapshot["linkUrl"] = "https://www.facebook.com/some.page"
+        ad["searchKeyword"] = rng.choice(["skincare", "fitness"])
+        ad["searchCountry"] = "DE"
+        ads.append(ad)
+    return ads
+
+def legacy_extract(ads, stats, known_domains=None):
+    """The previous per-ad loop (without its per-lead print), as baseline."""
+    known_domains = known_domains or set()
+    processed_domains = {}
+    for ad in ads:
+        stats["fetched"] += 1
+        source = (ad.get("searchKeyword"), ad.get("searchCountry"))
+        snapshot = ad.get("snapshot", {})
+        page_name = snapshot.get("pageName") or snapshot.get("page_name") or ad.get("pageName") or ad.get("page_name") or "Unknown"
+        website_url = snapshot.get("linkUrl") or snapshot.get("link_url")
+        ad_image = None
+        images = snapshot.get("images", [])
+        if images:
+            ad_image = images[0].get("original_image_url") or images[0].get("resized_image_url")
+        if not ad_image:
+            cards = snapshot.get("cards", [])
+            if cards:
+                ad_image = cards[0].get("original_image_url") or cards[0].get("resized_image_url")
+        if not website_url:
+            cards = snapshot.get("cards", [])
+            if cards and isinstance(cards, list):
+                website_url = cards[0].get("linkUrl") or cards[0].get("link_url")
+        if not website_url:
+            body = snapshot.get("body", {})
+            body_text = body.get("text", "") if isinstance(body, dict) else str(body)
+            if not body_text:
+                body_text = snapshot.get("title", "") or ad.get("ad_creative_body", "")
+            website_url = extract_domain(body_text)
+        if not website_url:
+            stats["no_website"] += 1
+            continue
+        website_url = str(website_url)
+        clean_domain = normalize_domain(website_url)
+        if not clean_domain or clean_domain in ["facebook.com", "instagram.com"]:
+            stats["no_website"] += 1
+            continue
+        if clean_domain in processed_domains:
+            stats["duplicates"] += 1
+            if processed_domains[clean_domain] != source:
+                stats["links"].append((website_url,) + source)
+            continue
+        processed_domains[clean_domain] = source
+        if clean_domain in known_domains:
+            stats["known"] += 1
+            stats["links"].append((website_url,) + source)
+            continue
+        stats["queued"] += 1
+        yield {
+            "Company": page_name,
+            "Website": website_url,
+            "Email": None,
+            "Ad URL": ad.get("ad_archive_url") or ad.get("adArchiveUrl") or ad.get("snapshotUrl") or ad.get("ad_library_url"),
+            "Ad Image": ad_image,
+            "Keyword": source[0],
+            "Country": source[1]
+        }
+
+def vectorized_extract(ads, stats, known_domains=None, batch_size=1000):
+    seen = {}
+    for start in range(0, len(ads), batch_size):
+        frame = select_candidates(extract_ads_frame(ads[start:start + batch_size]), stats, known_domains, seen)
+        yield from candidate_leads(frame)
+
+def _batched(extract, batch_size):
+    def run(ads, stats, known_domains=None):
+        seen = {}
+        for start in range(0, len(ads), batch_size):
+            yield from extract(ads[start:start + batch_size], stats, known_domains, seen)
+    return run
+
+def _new_stats():
+    return {"fetched": 0, "no_website": 0, "duplicates": 0, "known": 0, "queued": 0, "links": []}
+
+def _timed(extract, ads, known, repeat=3):
+    """Best of `repeat` runs: (leads, stats, seconds)."""
+    best = None
+    for _ in range(repeat):
+        stats = _new_stats()
+        started = time.perf_counter()
+        leads = list(extract(ads, stats, known))
+        elapsed = time.perf_counter() - started
+        if best is None or elapsed < best[2]:
+            best = (leads, stats, elapsed)
+    return best
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else REPLAY_BATCH_SIZE
+    ads = synthetic_ads(n)
+    known = {f"shop{i}.de" for i in range(0, n, 7)}
+
+    old_leads, old_stats, old_time = _timed(legacy_extract, ads, known)
+    new_leads, new_stats, new_time = _timed(lambda a, s, k: vectorized_extract(a, s, k, batch_size), ads, known)
+    loop_leads, loop_stats, _ = _timed(_batched(iter_candidates, batch_size), ads, known, repeat=1)
+    auto_leads, auto_stats, auto_time = _timed(_batched(extract_batch, batch_size), ads, known)
+
+    # Same leads, same counters, same links (order within a batch may differ)
+    old_links = sorted(old_stats.pop("links"))
+    for name, leads, stats in (("vectorized", new_leads, new_stats), ("per ad", loop_leads, loop_stats), ("extract_batch", auto_leads, auto_stats)):
+        assert old_leads == leads, f"{name}: leads differ"
+        assert old_links == sorted(stats.pop("links")), f"{name}: links differ"
+        assert old_stats == stats, f"{name}: stats differ: {old_stats} vs {stats}"
+    websites = [l["Website"] for l in old_leads]
+    assert [normalize_domain(w) for w in websites] == normalize_domains(websites), "domains differ"
+
+    print(f"📊 {n} ads -> {len(new_leads)} leads (batch size {batch_size})")
+    print(f"   per ad:     {old_time * 1000:8.1f} ms ({n / old_time:,.0f} ads/s)")
+    print(f"   vectorized: {new_time * 1000:8.1f} ms ({n / new_time:,.0f} ads/s, {old_time / new_time:.1f}x)")
+    print(f"   extract_batch: {auto_time * 1000:5.1f} ms ({n / auto_time:,.0f} ads/s, {old_time / auto_time:.1f}x)")
@@ -0,0 +1,101 @@
+import random
+import re
+import sys
+import time
+from urllib.parse import urljoin, urlparse
+from bs4 import BeautifulSoup
+from tools.page_scanner import etree, scan_html
+
+# python -m tools.bench_page_scan [pages] [paragraphs per page]
+# Compares the single-pass page scanner (html.parser and, if installed,
+# lxml) with the previous BeautifulSoup extraction on synthetic shop pages.
+
+BASE_URL = "https://www.shop.example/"
+
+def synthetic_pages(n, paragraphs=400, seed=7):
+    """
+    Shop-like homepages (big nav, inline scripts/styles, product grid,
+    footer with or without an address) as (html, expected email) pairs.
+    """
+    rng = random.Random(seed)
+    pages = []
+    for i in range(n):
+        nav = "".join(f'<li><a href="/kategorie/{k}">Kategorie {k}</a></li>' for k in range(60))
+        products = "".join(
+            f'<div class="product"><img src="/img/{k}.jpg" alt="Produkt {k}"><h3>Produkt {k}</h3>'
+            f'<p>Beschreibung {k} &amp; mehr – nur {rng.randint(5, 99)},99&nbsp;€</p>'
+            f'<a href="/produkt/{k}?ref=home" class="btn">Details</a></div>'
+            for k in range(paragraphs)
+        )
+        script = "<script>window.__STATE__ = {\"support\": \"noreply@tracking.example\", \"items\": [%s]};</script>" % ",".join(str(k) for k in range(2000))
+        kind = i % 4
+        if kind == 0:
+            footer, expected = f'<a href="mailto:info@shop{i}.example?subject=Hallo">Schreib uns</a>', f"info@shop{i}.example"
+        elif kind == 1:
+            footer, expected = f"<p>Kontakt: <b>service@shop{i}.example</b></p>", f"service@shop{i}.example"
+        elif kind == 2:
+            footer, expected = '<p>Fragen? Nutze unser Formular.</p>', None
+        else:
+            footer, expected = f"<p>kontakt<span>@shop{i}.example</span></p>", f"kontakt@shop{i}.example" # Split across nodes
+        footer += (
+            '<a href="/impressum">Impressum</a> <a href="/pages/kontakt">Kontakt</a>'
+            '<a href="https://instagram.com/shop">Instagram</a> <a href="/about-us">Über uns</a>'
+        )
+        pages.append((
+            f"<!DOCTYPE html><html><head><title>Shop {i}</title><style>.a{{color:red}}</style>{script}</head>"
+            f"<body><header><ul>{nav}</ul></header><main>{products}</main><footer>{footer}</footer></body></html>",
+            expected
+        ))
+    return pages
+
+# Previous implementation (WebsiteWalker._extract_email / _extract_contact_links), as baseline
+EMAIL_REGEX = r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}"
+
+def legacy_scan(html, base_url):
+    soup = BeautifulSoup(html, "html.parser")
+    email = None
+    mailto = soup.select_one("a[href^='mailto:']")
+    if mailto:
+        email = mailto["href"].replace("mailto:", "").split("?")[0].strip()
+    else:
+        match = re.search(EMAIL_REGEX, soup.get_text())
+        if match:
+            email = match.group(0)
+
+    likely_pages = []
+    keywords = ["contact", "kontakt", "impressum", "about", "über uns"]
+    for a in soup.find_all("a", href=True):
+        href = a["href"]
+        text = a.get_text().lower()
+        if any(k in text or k in href.lower() for k in keywords):
+            full_url = urljoin(base_url, href)
+            if urlparse(full_url).netloc == urlparse(base_url).netloc:
+                likely_pages.append(full_url)
+    return email, list(dict.fromkeys(likely_pages))[:3]
+
+def _timed(scan, pages):
+    started = time.perf_counter()
+    results = [scan(html) for html, _ in pages]
+    return results, time.perf_counter() - started
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    paragraphs = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+    pages = synthetic_pages(n, paragraphs)
+    size = sum(len(html) for html, _ in pages) / n / 1024
+    expected = [email for _, email in pages]
+
+    legacy, legacy_time = _timed(lambda html: legacy_scan(html, BASE_URL), pages)
+    legacy_hits = sum(e[0] == x for e, x in zip(legacy, expected))
+    print(f"📊 {n} pages, ~{size:.0f} KB each")
+    print(f"   BeautifulSoup: {legacy_time / n * 1000:7.1f} ms/page, {legacy_hits}/{n} emails right")
+
+    backends = ["html.parser"] + (["lxml"] if etree is not None else [])
+    for backend in backends:
+        results, elapsed = _timed(lambda html: scan_html(html, BASE_URL, backend), pages)
+        assert [r.email for r in results] == expected, f"{backend}: wrong emails"
+        # Contact links are only complete where no mailto: ended the scan
+        assert all(sorted(r.contact_links) == sorted(e[1]) for r, e in zip(results, legacy) if not r.mailto), f"{backend}: contact links differ"
+        print(f"   {backend + ':':14} {elapsed / n * 1000:7.1f} ms/page ({legacy_time / elapsed:.1f}x), {n}/{n} emails right")
+    if etree is None:
+        print("   (lxml not installed: pip install lxml for the faster backend)")
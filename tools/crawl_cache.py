@@ -0,0 +1,114 @@
+import sqlite3
+import threading
+import time
+from tools.domains import normalize_domain
+
+CACHE_FILE = "crawl_cache.db" # Lives next to leads.db
+
+DAY = 24 * 60 * 60
+
+class CrawlCache:
+    """
+    On-disk cache of domain -> email crawl results (SQLite).
+    Negative results ("Not Found") are cached too, with their own TTL,
+    so shops that show up in every search are only crawled once.
+    """
+    def __init__(self, db_file=CACHE_FILE, positive_ttl=30 * DAY, negative_ttl=3 * DAY, max_entries=50000):
+        self.db_file = db_file
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.evict_every = 100 # Size check interval (puts)
+        self._puts = 0
+
+        # One connection shared by the crawl threads, serialized by a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS crawl_cache (
+                domain TEXT PRIMARY KEY,
+                email TEXT,
+                checked_at REAL NOT NULL
+            )
+        ''')
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_crawl_cache_checked_at ON crawl_cache(checked_at)")
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, url):
+        """
+        Returns (hit, email). A hit with email=None is a cached "Not Found".
+        Expired entries count as a miss.
+        """
+        domain = normalize_domain(url)
+        if not domain:
+            return False, None
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT email, checked_at FROM crawl_cache WHERE domain = ?", (domain,)
+            ).fetchone()
+
+            if row:
+                email, checked_at = row
+                ttl = self.positive_ttl if email else self.negative_ttl
+                if time.time() - checked_at < ttl:
+                    self.hits += 1
+                    return True, email
+
+            self.misses += 1
+            return False, None
+
+    def put(self, url, email):
+        """Stores a crawl result (email or None for "Not Found")."""
+        domain = normalize_domain(url)
+        if not domain:
+            return
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO crawl_cache (domain, email, checked_at) VALUES (?, ?, ?)",
+                (domain, email, time.time())
+            )
+            self._puts += 1
+            if self._puts % self.evict_every == 0:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drops the oldest entries once the cache grows beyond max_entries."""
+        count = self._conn.execute("SELECT COUNT(*) FROM crawl_cache").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute('''
+                DELETE FROM crawl_cache WHERE domain IN (
+                    SELECT domain FROM crawl_cache ORDER BY checked_at ASC LIMIT ?
+                )
+            ''', (overflow,))
+
+    def purge_expired(self):
+        """Removes all entries past their TTL. Returns the number removed."""
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute('''
+                DELETE FROM crawl_cache
+                WHERE (email IS NOT NULL AND checked_at < ?)
+                   OR (email IS NULL AND checked_at < ?)
+            ''', (now - self.positive_ttl, now - self.negative_ttl))
+            self._conn.commit()
+            return cur.rowcount
+
+    def stats(self):
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM crawl_cache").fetchone()[0]
+        return {"entries": size, "hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+if __name__ == "__main__":
+    cache = CrawlCache()
+    print(f"🧹 Purged {cache.purge_expired()} expired entries.")
+    print(cache.stats())
@@ -1,16 +1,126 @@
 import sqlite3
 import hashlib
 import os
+import threading
 import pandas as pd
-from datetime import datetime
+from datetime import datetime, timedelta
+from tools.domains import normalize_domain
 
 DB_FILE = "leads.db"
 
+# Managed secondary indexes: name -> definition.
+# ensure_indexes() creates missing ones, rebuilds changed ones and drops
+# managed indexes ("idx_" prefix) that are no longer listed here.
+INDEXES = {
+    # get_user_leads: WHERE user_id = ? ... ORDER BY timestamp DESC
+    "idx_leads_user_ts": "CREATE INDEX idx_leads_user_ts ON leads(user_id, timestamp)",
+    # leads of a search (Kategorien detail view, joins from searches)
+    "idx_leads_search": "CREATE INDEX idx_leads_search ON leads(search_id)",
+    # get_searches / Kategorien: WHERE user_id = ? ORDER BY timestamp DESC
+    "idx_searches_user_ts": "CREATE INDEX idx_searches_user_ts ON searches(user_id, timestamp)",
+    # Top keywords: WHERE user_id = ? GROUP BY keyword
+    "idx_searches_user_keyword": "CREATE INDEX idx_searches_user_keyword ON searches(user_id, keyword)",
+    # One lead per shop and user, across all searches (_insert_leads upserts on it)
+    "idx_leads_user_domain": "CREATE UNIQUE INDEX idx_leads_user_domain ON leads(user_id, domain_key) WHERE domain_key IS NOT NULL",
+    # Leads of a search via lead_searches (keyword / category filters)
+    "idx_lead_searches_search": "CREATE INDEX idx_lead_searches_search ON lead_searches(search_id)",
+    # get_resumable_apify_run: same query, newest run first
+    "idx_apify_runs_query": "CREATE INDEX idx_apify_runs_query ON apify_runs(keyword, country, max_results, started_at)",
+    # get_open_todos / count_open_todos: partial index over unprocessed leads only (TODO_WHERE)
+    "idx_leads_todo": """CREATE INDEX idx_leads_todo ON leads(user_id, timestamp)
+        WHERE COALESCE(newsletter_signup, 0) = 0 AND COALESCE(cart_abandoned, 0) = 0
+        AND COALESCE(no_newsletter, 0) = 0 AND COALESCE(deleted, 0) = 0""",
+    # get_follow_ups / count_follow_ups: pending tasks by due date (FOLLOW_UP_WHERE)
+    "idx_leads_follow_up": """CREATE INDEX idx_leads_follow_up ON leads(user_id, follow_up_date)
+        WHERE follow_up_date IS NOT NULL AND follow_up_date != ''
+        AND COALESCE(follow_up_status, 'pending') != 'completed' AND COALESCE(deleted, 0) = 0""",
+}
+
+_trace_callback = None
+
+def set_trace_callback(callback):
+    """Debug hook: new connections report every executed SQL statement to `callback`."""
+    global _trace_callback
+    _trace_callback = callback
+
+# Connection pool: long-lived connections per database file, shared by the
+# whole process. Streamlit runs every rerun on a fresh ScriptRunner thread,
+# so a per-thread connection would only live for one rerun; here a thread
+# borrows a connection on get_connection() and conn.close() returns it.
+# Nested calls on the same thread get the same connection. WAL lets the
+# pooled connections read while one writes.
+_local = threading.local() # This thread's borrowed connections: path -> conn
+_idle = {} # path -> idle connections, shared by all threads
+_pool_lock = threading.Lock()
+POOL_SIZE = 8 # Idle connections kept per database file
+
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL", # WAL + NORMAL: no fsync per commit
+    "PRAGMA cache_size = -20000", # ~20 MB page cache
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 5000"
+)
+
+class PooledConnection(sqlite3.Connection):
+    """
+    Connection handed out by get_connection(). Callers keep their
+    `conn.close()` calls: the outermost close() only rolls back unfinished
+    work and returns the connection (and its prepared statement cache) to
+    the pool. A connection never closed stays with its thread.
+    """
+    def close(self):
+        self._depth -= 1
+        if self._depth > 0:
+            return # Nested get_connection() on this thread: the outer caller still uses it
+        if self.in_transaction:
+            self.rollback()
+        getattr(_local, "connections", {}).pop(self._path, None)
+        with _pool_lock:
+            idle = _idle.setdefault(self._path, [])
+            if len(idle) < POOL_SIZE:
+                idle.append(self)
+                return
+        self.really_close()
+
+    def really_close(self):
+        sqlite3.Connection.close(self)
+
 def get_connection():
-    conn = sqlite3.connect(DB_FILE)
+    key = os.path.abspath(DB_FILE)
+    borrowed = getattr(_local, "connections", None)
+    if borrowed is None:
+        borrowed = _local.connections = {}
+    
+    conn = borrowed.get(key)
+    if conn is None:
+        with _pool_lock:
+            idle = _idle.get(key)
+            conn = idle.pop() if idle else None
+        if conn is None:
+            # check_same_thread=False: a pooled connection moves between threads, one at a time
+            conn = sqlite3.connect(key, factory=PooledConnection, timeout=5, cached_statements=256, check_same_thread=False)
+            for pragma in PRAGMAS:
+                conn.execute(pragma)
+            conn._path = key
+        conn._depth = 0
+        borrowed[key] = conn
+    
+    conn._depth += 1
     conn.row_factory = sqlite3.Row
+    conn.set_trace_callback(_trace_callback)
     return conn
 
+def close_connections():
+    """Really closes all pooled connections and this thread's borrowed ones (tests, shutdown)."""
+    borrowed = getattr(_local, "connections", {})
+    with _pool_lock:
+        conns = list(borrowed.values()) + [conn for idle in _idle.values() for conn in idle]
+        borrowed.clear()
+        _idle.clear()
+    for conn in conns:
+        conn.really_close()
+
 def init_db():
     conn = get_connection()
     c = conn.cursor()
@@ -62,6 +172,37 @@ def init_db():
         )
     ''')
     
+    # Lead <-> Search links: a shop found by several searches is stored once
+    # (leads.search_id = first search) and linked to every search here
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS lead_searches (
+            lead_id INTEGER NOT NULL,
+            search_id INTEGER NOT NULL,
+            PRIMARY KEY (lead_id, search_id)
+        ) WITHOUT ROWID
+    ''')
+    _ensure_trigger(c, "trg_lead_searches_delete", '''
+        CREATE TRIGGER trg_lead_searches_delete AFTER DELETE ON leads
+        BEGIN
+            DELETE FROM lead_searches WHERE lead_id = OLD.id;
+        END
+    ''')
+    
+    # Apify actor runs: a reloaded/crashed session resumes reading the
+    # dataset of its run instead of paying for a new one
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS apify_runs (
+            run_id TEXT PRIMARY KEY,
+            keyword TEXT,
+            country TEXT,
+            max_results INTEGER,
+            dataset_id TEXT,
+            status TEXT,
+            started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            consumed_at TIMESTAMP
+        )
+    ''')
+    
     # Default Admin User (admin / admin123)
     # Simple SHA256 for prototype
     admin_pw = hashlib.sha256("admin123".encode()).hexdigest()
@@ -76,6 +217,10 @@ def init_db():
     
     # Run Migrations (for existing DBs)
     migrate_db()
+    ensure_indexes()
+    ensure_lead_stats()
+    ensure_sync_log()
+    ensure_lead_search()
 
 def migrate_db():
     """Adds new columns to existing databases without breaking them."""
@@ -123,6 +268,329 @@ def migrate_db():
     except sqlite3.OperationalError:
         pass
         
+    # Phase 21: Cross-search Deduplication
+    try:
+        c.execute("ALTER TABLE leads ADD COLUMN domain_key TEXT")
+        _backfill_domain_keys(c)
+        c.execute("INSERT OR IGNORE INTO lead_searches (lead_id, search_id) SELECT id, search_id FROM leads WHERE search_id IS NOT NULL")
+        print("✅ Database migrated: Added domain deduplication.")
+    except sqlite3.OperationalError:
+        pass
+        
+    conn.commit()
+    conn.close()
+
+def _backfill_domain_keys(c):
+    """
+    Sets domain_key on existing leads. Older duplicates stay as they are:
+    only the first lead (lowest id) per user and domain gets the key, so the
+    unique index can be built without deleting anyone's data.
+    """
+    seen = set()
+    updates = []
+    for lead_id, user_id, website in c.execute("SELECT id, user_id, website FROM leads ORDER BY id").fetchall():
+        key = normalize_domain(website)
+        if key and (user_id, key) not in seen:
+            seen.add((user_id, key))
+            updates.append((key, lead_id))
+    c.executemany("UPDATE leads SET domain_key = ? WHERE id = ?", updates)
+
+def ensure_indexes():
+    """Creates/migrates the managed secondary indexes (see INDEXES)."""
+    conn = get_connection()
+    c = conn.cursor()
+    
+    existing = {
+        row["name"]: " ".join(row["sql"].split())
+        for row in c.execute("SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL")
+        if row["name"].startswith("idx_")
+    }
+    
+    # Drop indexes that were removed from INDEXES or whose definition changed
+    for name, sql in existing.items():
+        if name not in INDEXES or sql != " ".join(INDEXES[name].split()):
+            c.execute(f"DROP INDEX IF EXISTS {name}")
+            if name in INDEXES:
+                print(f"🔧 Rebuilding index {name}")
+            else:
+                print(f"🗑️ Dropped obsolete index {name}")
+    
+    for name, sql in INDEXES.items():
+        if existing.get(name) != " ".join(sql.split()):
+            c.execute(sql)
+            print(f"✅ Created index {name}")
+    
+    conn.commit()
+    conn.close()
+
+# Flag column -> counter column in lead_stats
+STAT_COUNTERS = {
+    "newsletter_signup": "newsletter_signups",
+    "cart_abandoned": "cart_abandoned",
+    "email_sent": "emails_sent",
+    "response_received": "responses",
+    "converted": "conversions"
+}
+
+def _stats_delta_sql(sign, ref):
+    """SET clause fragment adding/subtracting one lead (NEW/OLD) to the counters."""
+    parts = [f"total_leads = total_leads {sign} 1"]
+    for flag, counter in STAT_COUNTERS.items():
+        parts.append(f"{counter} = {counter} {sign} (IFNULL({ref}.{flag}, 0) = 1)")
+    return ", ".join(parts)
+
+def _ensure_trigger(c, name, sql):
+    """Creates a trigger, or replaces it if its stored definition differs."""
+    c.execute("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = ?", (name,))
+    row = c.fetchone()
+    if row and " ".join(row[0].split()) == " ".join(sql.split()):
+        return
+    c.execute(f"DROP TRIGGER IF EXISTS {name}")
+    c.execute(sql)
+
+def ensure_lead_stats():
+    """
+    Per-user dashboard counters, maintained incrementally by triggers on
+    leads so get_dashboard_stats() is O(1) no matter how many leads exist.
+    """
+    conn = get_connection()
+    c = conn.cursor()
+    
+    c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'lead_stats'")
+    is_new = c.fetchone() is None
+    
+    counters = ", ".join(f"{counter} INTEGER NOT NULL DEFAULT 0" for counter in STAT_COUNTERS.values())
+    c.execute(f'''
+        CREATE TABLE IF NOT EXISTS lead_stats (
+            user_id INTEGER PRIMARY KEY,
+            total_leads INTEGER NOT NULL DEFAULT 0,
+            {counters}
+        )
+    ''')
+    
+    # Note: no INSERT OR IGNORE inside the triggers - an UPSERT on leads
+    # overrides the conflict policy of trigger statements.
+    flags = ", ".join(STAT_COUNTERS)
+    missing_row = "WHERE NOT EXISTS (SELECT 1 FROM lead_stats WHERE user_id = NEW.user_id)"
+    _ensure_trigger(c, "trg_lead_stats_insert", f'''
+        CREATE TRIGGER trg_lead_stats_insert AFTER INSERT ON leads
+        WHEN NEW.user_id IS NOT NULL
+        BEGIN
+            INSERT INTO lead_stats (user_id) SELECT NEW.user_id {missing_row};
+            UPDATE lead_stats SET {_stats_delta_sql("+", "NEW")} WHERE user_id = NEW.user_id;
+        END
+    ''')
+    _ensure_trigger(c, "trg_lead_stats_delete", f'''
+        CREATE TRIGGER trg_lead_stats_delete AFTER DELETE ON leads
+        WHEN OLD.user_id IS NOT NULL
+        BEGIN
+            UPDATE lead_stats SET {_stats_delta_sql("-", "OLD")} WHERE user_id = OLD.user_id;
+        END
+    ''')
+    _ensure_trigger(c, "trg_lead_stats_update", f'''
+        CREATE TRIGGER trg_lead_stats_update AFTER UPDATE OF user_id, {flags} ON leads
+        BEGIN
+            UPDATE lead_stats SET {_stats_delta_sql("-", "OLD")} WHERE user_id = OLD.user_id;
+            INSERT INTO lead_stats (user_id) SELECT NEW.user_id {missing_row} AND NEW.user_id IS NOT NULL;
+            UPDATE lead_stats SET {_stats_delta_sql("+", "NEW")} WHERE user_id = NEW.user_id;
+        END
+    ''')
+    
+    conn.commit()
+    conn.close()
+    
+    # Backfill counters for databases that existed before lead_stats
+    if is_new:
+        rebuild_lead_stats()
+
+def rebuild_lead_stats():
+    """Recomputes all counters from leads in a single aggregate pass."""
+    conn = get_connection()
+    c = conn.cursor()
+    sums = ", ".join(f"SUM(IFNULL({flag}, 0) = 1)" for flag in STAT_COUNTERS)
+    c.execute("DELETE FROM lead_stats")
+    c.execute(f'''
+        INSERT INTO lead_stats (user_id, total_leads, {", ".join(STAT_COUNTERS.values())})
+        SELECT user_id, COUNT(*), {sums}
+        FROM leads
+        WHERE user_id IS NOT NULL
+        GROUP BY user_id
+    ''')
+    conn.commit()
+    conn.close()
+
+def ensure_sync_log():
+    """
+    Change log for the Google Sheets delta sync: triggers record the ID of
+    every inserted, updated or deleted lead until the sync pushed it. One
+    row per lead (a new change replaces it with a higher seq; no INSERT OR
+    REPLACE, see ensure_lead_stats), so the log
+    stays bounded by the number of leads while Sheets isn't reachable or
+    configured. sync_state keeps restore markers (sheet revision / checksum).
+    """
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS sync_state (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS sync_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            lead_id INTEGER NOT NULL,
+            op TEXT NOT NULL,
+            changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    # Not in INDEXES: the table only exists from here on. Older logs hold one row per change: keep the newest.
+    c.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'sync_log_lead'")
+    if c.fetchone() is None:
+        c.execute("DELETE FROM sync_log WHERE seq NOT IN (SELECT MAX(seq) FROM sync_log GROUP BY lead_id)")
+        c.execute("CREATE UNIQUE INDEX sync_log_lead ON sync_log(lead_id)")
+    _ensure_trigger(c, "trg_sync_log_insert", '''
+        CREATE TRIGGER trg_sync_log_insert AFTER INSERT ON leads
+        BEGIN
+            DELETE FROM sync_log WHERE lead_id = NEW.id;
+            INSERT INTO sync_log (lead_id, op) VALUES (NEW.id, 'I');
+        END
+    ''')
+    _ensure_trigger(c, "trg_sync_log_update", '''
+        CREATE TRIGGER trg_sync_log_update AFTER UPDATE ON leads
+        BEGIN
+            DELETE FROM sync_log WHERE lead_id = NEW.id;
+            INSERT INTO sync_log (lead_id, op) VALUES (NEW.id, 'U');
+        END
+    ''')
+    _ensure_trigger(c, "trg_sync_log_delete", '''
+        CREATE TRIGGER trg_sync_log_delete AFTER DELETE ON leads
+        BEGIN
+            DELETE FROM sync_log WHERE lead_id = OLD.id;
+            INSERT INTO sync_log (lead_id, op) VALUES (OLD.id, 'D');
+        END
+    ''')
+    conn.commit()
+    conn.close()
+
+# Columns mirrored into the full-text index (leads_fts)
+SEARCH_COLUMNS = ("company", "website", "email", "notes")
+
+def ensure_lead_search():
+    """
+    FTS5 index over SEARCH_COLUMNS (external content: no copy of the text,
+    rowid = leads.id), kept in sync by triggers. The trigram tokenizer makes
+    any substring of 3+ characters searchable ("shop" finds "myshop.de");
+    older SQLite builds fall back to word/prefix matching, builds without
+    FTS5 to LIKE (see search_leads).
+    """
+    _search_tokenizers.pop(os.path.abspath(DB_FILE), None)
+    conn = get_connection()
+    c = conn.cursor()
+    
+    c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'leads_fts'")
+    if c.fetchone() is None:
+        columns = ", ".join(SEARCH_COLUMNS)
+        for tokenizer in ("trigram", "unicode61 remove_diacritics 2"):
+            try:
+                c.execute(f"""
+                    CREATE VIRTUAL TABLE leads_fts USING fts5(
+                        {columns}, content='leads', content_rowid='id', tokenize='{tokenizer}'
+                    )
+                """)
+            except sqlite3.OperationalError:
+                continue # Tokenizer (or FTS5 itself) not compiled in
+            c.execute("INSERT INTO leads_fts(leads_fts) VALUES ('rebuild')") # Index existing leads
+            print(f"✅ Created full-text index leads_fts ({tokenizer.split()[0]})")
+            break
+        else:
+            print("⚠️ FTS5 not available: lead search falls back to LIKE.")
+            conn.close()
+            return
+    
+    columns = ", ".join(SEARCH_COLUMNS)
+    new_values = ", ".join(f"NEW.{col}" for col in SEARCH_COLUMNS)
+    old_values = ", ".join(f"OLD.{col}" for col in SEARCH_COLUMNS)
+    _ensure_trigger(c, "trg_leads_fts_insert", f'''
+        CREATE TRIGGER trg_leads_fts_insert AFTER INSERT ON leads
+        BEGIN
+            INSERT INTO leads_fts (rowid, {columns}) VALUES (NEW.id, {new_values});
+        END
+    ''')
+    _ensure_trigger(c, "trg_leads_fts_delete", f'''
+        CREATE TRIGGER trg_leads_fts_delete AFTER DELETE ON leads
+        BEGIN
+            INSERT INTO leads_fts (leads_fts, rowid, {columns}) VALUES ('delete', OLD.id, {old_values});
+        END
+    ''')
+    # Only text edits re-index; flag/checkbox updates don't touch the index
+    _ensure_trigger(c, "trg_leads_fts_update", f'''
+        CREATE TRIGGER trg_leads_fts_update AFTER UPDATE OF {columns} ON leads
+        BEGIN
+            INSERT INTO leads_fts (leads_fts, rowid, {columns}) VALUES ('delete', OLD.id, {old_values});
+            INSERT INTO leads_fts (rowid, {columns}) VALUES (NEW.id, {new_values});
+        END
+    ''')
+    _lead_search_tokenizer(c)
+    conn.commit()
+    conn.close()
+
+_search_tokenizers = {} # database path -> tokenizer of its leads_fts
+
+def _lead_search_tokenizer(c):
+    """'trigram', 'unicode61' or None if there is no full-text index."""
+    path = os.path.abspath(DB_FILE)
+    if path not in _search_tokenizers:
+        c.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'leads_fts'")
+        row = c.fetchone()
+        tokenizer = None
+        if row is not None:
+            tokenizer = "trigram" if "trigram" in row[0] else "unicode61"
+        _search_tokenizers[path] = tokenizer
+    return _search_tokenizers[path]
+
+# Runs in these states never produce (more) results
+APIFY_FAILED_STATES = ("FAILED", "ABORTING", "ABORTED", "TIMING-OUT", "TIMED-OUT")
+
+def get_resumable_apify_run(keyword, country, max_results, max_age_hours=24):
+    """
+    Newest run for this query that was started recently and whose dataset
+    hasn't been read to the end yet (None if a new run is needed).
+    """
+    conn = get_connection()
+    c = conn.cursor()
+    placeholders = ", ".join("?" for _ in APIFY_FAILED_STATES)
+    c.execute(f'''
+        SELECT run_id, dataset_id, status FROM apify_runs
+        WHERE keyword = ? AND country = ? AND max_results = ?
+        AND started_at >= datetime('now', ?)
+        AND consumed_at IS NULL AND status NOT IN ({placeholders})
+        ORDER BY started_at DESC LIMIT 1
+    ''', (keyword, country, max_results, f"-{int(max_age_hours)} hours") + APIFY_FAILED_STATES)
+    row = c.fetchone()
+    conn.close()
+    return dict(row) if row else None
+
+def save_apify_run(run_id, keyword, country, max_results, dataset_id, status):
+    conn = get_connection()
+    conn.execute(
+        "INSERT OR REPLACE INTO apify_runs (run_id, keyword, country, max_results, dataset_id, status) VALUES (?, ?, ?, ?, ?, ?)",
+        (run_id, keyword, country, max_results, dataset_id, status)
+    )
+    conn.commit()
+    conn.close()
+
+def update_apify_run(run_id, status):
+    """Records a new run status (failed runs are never resumed)."""
+    conn = get_connection()
+    conn.execute("UPDATE apify_runs SET status = ? WHERE run_id = ?", (status, run_id))
+    conn.commit()
+    conn.close()
+
+def mark_apify_runs_consumed(run_ids):
+    """Runs whose ads were fully processed: never resumed again."""
+    conn = get_connection()
+    conn.executemany("UPDATE apify_runs SET consumed_at = CURRENT_TIMESTAMP WHERE run_id = ?", [(r,) for r in run_ids])
     conn.commit()
     conn.close()
 
@@ -135,6 +603,15 @@ def verify_user(username, password):
     conn.close()
     return user
 
+# UI/DataFrame column -> leads column for ingest
+LEAD_INGEST_COLUMNS = {
+    "Company": "company",
+    "Website": "website",
+    "Email": "email",
+    "Ad URL": "ad_url",
+    "Ad Image": "ad_image"
+}
+
 def save_search_results(user_id, keyword, country, df):
     if df.empty:
         return
@@ -143,35 +620,300 @@ def save_search_results(user_id, keyword, country, df):
     c = conn.cursor()
     
     # 1. Log Search
-    c.execute("INSERT INTO searches (user_id, keyword, country, num_leads) VALUES (?, ?, ?, ?)", 
-              (user_id, keyword, country, len(df)))
+    c.execute("INSERT INTO searches (user_id, keyword, country, num_leads) VALUES (?, ?, ?, 0)", 
+              (user_id, keyword, country))
     search_id = c.lastrowid
     
-    # 2. Save Leads
-    for _, row in df.iterrows():
-        c.execute('''
-            INSERT INTO leads (user_id, search_id, company, website, email, ad_url, ad_image)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            user_id, 
-            search_id, 
-            row.get("Company"), 
-            row.get("Website"), 
-            row.get("Email"), 
-            row.get("Ad URL"), 
-            row.get("Ad Image")
-        ))
+    # 2. Save Leads (bulk upsert, same transaction)
+    _, linked = _insert_leads(c, user_id, search_id, df)
+    c.execute("UPDATE searches SET num_leads = ? WHERE id = ?", (linked, search_id))
         
     conn.commit()
     conn.close()
+    invalidate_lead_cache(user_id)
     return search_id
 
-def get_user_leads(user_id, filter_status='active'):
+def save_leads_bulk(user_id, search_id, leads):
+    """
+    Bulk ingestion: writes a whole batch (DataFrame or list of dicts) in one
+    transaction via executemany. Returns the lead IDs in input order
+    (already known shops return their existing lead).
+    """
+    conn = get_connection()
+    c = conn.cursor()
+    try:
+        lead_ids, linked = _insert_leads(c, user_id, search_id, leads)
+        c.execute("UPDATE searches SET num_leads = COALESCE(num_leads, 0) + ? WHERE id = ?", (linked, search_id))
+        conn.commit()
+        invalidate_lead_cache(user_id)
+        return lead_ids
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def import_leads_csv(user_id, csv_path, keyword, country, chunksize=10000):
+    """
+    Imports a leads CSV (orchestrator format) as a new search.
+    Reads in chunks so tens of thousands of rows stay cheap on memory.
+    Returns (search_id, lead_ids).
+    """
+    search_id = create_search(user_id, keyword, country)
+    lead_ids = []
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+        lead_ids += save_leads_bulk(user_id, search_id, chunk)
+    return search_id, lead_ids
+
+def _insert_leads(c, user_id, search_id, leads):
+    """
+    Upsert ingest: leads whose shop (domain_key) the user already has are
+    not inserted again, the existing lead is linked to this search instead.
+    Returns (lead IDs in input order, number of leads newly linked to the search).
+    """
+    if isinstance(leads, pd.DataFrame):
+        frame = leads.reindex(columns=list(LEAD_INGEST_COLUMNS))
+    else:
+        frame = pd.DataFrame(list(leads), columns=list(LEAD_INGEST_COLUMNS))
+    if frame.empty:
+        return [], 0
+        
+    # NaN -> NULL, numpy scalars -> native Python values
+    frame = frame.astype(object).where(frame.notna(), None)
+    keys = [normalize_domain(website) for website in frame["Website"]]
+    rows = [(user_id, search_id) + row + (key,) for row, key in zip(frame.itertuples(index=False, name=None), keys)]
+    insert_sql = '''
+        INSERT INTO leads (user_id, search_id, company, website, email, ad_url, ad_image, domain_key)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+    
+    # Leads without a domain can't be deduplicated: plain insert. Rows of one
+    # executemany inside a single write transaction get consecutive rowids,
+    # ending at last_insert_rowid().
+    unkeyed = [row for row in rows if row[-1] is None]
+    unkeyed_ids = iter([])
+    if unkeyed:
+        c.executemany(insert_sql, unkeyed)
+        last_id = c.execute("SELECT last_insert_rowid()").fetchone()[0]
+        unkeyed_ids = iter(range(last_id - len(unkeyed) + 1, last_id + 1))
+    
+    # Known shops are skipped by the unique index, then every key is mapped to its lead
+    ids_by_key = {}
+    keyed = [row for row in rows if row[-1] is not None]
+    if keyed:
+        c.executemany(insert_sql + " ON CONFLICT (user_id, domain_key) WHERE domain_key IS NOT NULL DO NOTHING", keyed)
+        unique_keys = list(dict.fromkeys(row[-1] for row in keyed))
+        for i in range(0, len(unique_keys), 500):
+            chunk = unique_keys[i:i + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+            ids_by_key.update(c.execute(
+                f"SELECT domain_key, id FROM leads WHERE user_id IS ? AND domain_key IN ({placeholders})",
+                [user_id] + chunk
+            ).fetchall())
+    
+    lead_ids = [ids_by_key[key] if key is not None else next(unkeyed_ids) for key in keys]
+    
+    c.executemany(
+        "INSERT OR IGNORE INTO lead_searches (lead_id, search_id) VALUES (?, ?)",
+        [(lead_id, search_id) for lead_id in dict.fromkeys(lead_ids)]
+    )
+    return lead_ids, c.rowcount
+
+def create_search(user_id, keyword, country):
+    """Logs a search up front so streamed leads can be attached to it."""
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute("INSERT INTO searches (user_id, keyword, country, num_leads) VALUES (?, ?, ?, 0)", 
+              (user_id, keyword, country))
+    search_id = c.lastrowid
+    conn.commit()
+    conn.close()
+    return search_id
+
+def get_known_domains(user_id):
+    """Normalized domains (see tools.domains) of all leads the user already has, incl. Papierkorb."""
+    conn = get_connection()
+    rows = conn.execute("SELECT domain_key FROM leads WHERE user_id = ? AND domain_key IS NOT NULL", (user_id,)).fetchall()
+    conn.close()
+    return {row[0] for row in rows}
+
+def link_known_leads(user_id, search_id, websites):
+    """
+    Links the user's existing leads for these websites to a search (for
+    shops the orchestrator skipped as already known). Returns the number of new links.
+    """
+    keys = list(dict.fromkeys(k for k in (normalize_domain(w) for w in websites) if k))
+    if not keys:
+        return 0
+    conn = get_connection()
+    c = conn.cursor()
+    linked = 0
+    for i in range(0, len(keys), 500):
+        chunk = keys[i:i + 500]
+        placeholders = ", ".join("?" for _ in chunk)
+        c.execute(f'''
+            INSERT OR IGNORE INTO lead_searches (lead_id, search_id)
+            SELECT id, ? FROM leads WHERE user_id = ? AND domain_key IN ({placeholders})
+        ''', [search_id, user_id] + chunk)
+        linked += c.rowcount
+    c.execute("UPDATE searches SET num_leads = COALESCE(num_leads, 0) + ? WHERE id = ?", (linked, search_id))
+    conn.commit()
+    conn.close()
+    invalidate_lead_cache(user_id)
+    return linked
+
+def save_lead(user_id, search_id, lead):
+    """
+    Persists a single streamed lead right away (one small transaction),
+    so a crashed search keeps everything found so far.
+    A shop the user already has is linked to the search, not duplicated.
+    """
+    conn = get_connection()
+    c = conn.cursor()
+    lead_ids, linked = _insert_leads(c, user_id, search_id, [lead])
+    lead_id = lead_ids[0]
+    c.execute("UPDATE searches SET num_leads = num_leads + ? WHERE id = ?", (linked, search_id))
+    conn.commit()
+    conn.close()
+    invalidate_lead_cache(user_id)
+    return lead_id
+
+# Lead frame cache: (user_id, query key) -> result, shared by all
+# sessions of this process. Reruns reuse the frame until a write through
+# this module touches the user's leads (see invalidate_lead_cache).
+_frame_cache = {} # (user_id, key) -> (result, rows)
+_frame_generation = {None: 0} # user_id -> bumped on every invalidation (None: all users)
+_frame_cache_lock = threading.Lock()
+_frame_cache_rows = 0
+FRAME_CACHE_SIZE = 64
+FRAME_CACHE_ROWS = 200000 # Rows over all cached frames (unpaged frames of big users add up fast)
+MAX_CACHED_FRAME_ROWS = 50000 # Bigger results are served but not cached
+
+def _cached_frame(user_id, key, loader):
+    """Returns the cached result of loader() (DataFrames are copied)."""
+    global _frame_cache_rows
+    cache_key = (user_id, key)
+    with _frame_cache_lock:
+        entry = _frame_cache.get(cache_key)
+        generation = (_frame_generation[None], _frame_generation.get(user_id, 0))
+    if entry is None:
+        df = loader()
+        rows = len(df) if isinstance(df, pd.DataFrame) else 1
+        with _frame_cache_lock:
+            # Don't store a frame that a concurrent write already made stale
+            if rows <= MAX_CACHED_FRAME_ROWS and (_frame_generation[None], _frame_generation.get(user_id, 0)) == generation:
+                _drop_frame(cache_key)
+                while _frame_cache and (len(_frame_cache) >= FRAME_CACHE_SIZE or _frame_cache_rows + rows > FRAME_CACHE_ROWS):
+                    _drop_frame(next(iter(_frame_cache))) # Drop the oldest entry
+                _frame_cache[cache_key] = (df, rows)
+                _frame_cache_rows += rows
+    else:
+        df = entry[0]
+    # Callers add/modify columns: hand out a copy, keep the cached frame pristine
+    return df.copy() if isinstance(df, pd.DataFrame) else df
+
+def _drop_frame(cache_key):
+    """Removes one entry (caller holds _frame_cache_lock)."""
+    global _frame_cache_rows
+    entry = _frame_cache.pop(cache_key, None)
+    if entry is not None:
+        _frame_cache_rows -= entry[1]
+
+def invalidate_lead_cache(user_id=None):
+    """Drops cached frames of one user (or of everyone if user_id is None)."""
+    with _frame_cache_lock:
+        if user_id is None:
+            for cache_key in list(_frame_cache):
+                _drop_frame(cache_key)
+            _frame_generation[None] += 1
+            return
+        _frame_generation[user_id] = _frame_generation.get(user_id, 0) + 1
+        for cache_key in [k for k in _frame_cache if k[0] == user_id]:
+            _drop_frame(cache_key)
+
+def _invalidate_for_leads(c, lead_ids):
+    """Invalidates the users owning the given leads."""
+    lead_ids = list(lead_ids)
+    for i in range(0, len(lead_ids), 500):
+        chunk = lead_ids[i:i + 500]
+        placeholders = ", ".join("?" for _ in chunk)
+        for row in c.execute(f"SELECT DISTINCT user_id FROM leads WHERE id IN ({placeholders})", chunk).fetchall():
+            invalidate_lead_cache(row[0])
+
+# Sortable UI columns -> SQL expression (whitelist for ORDER BY)
+LEAD_SORT_COLUMNS = {
+    "Date": "l.timestamp",
+    "Company": "l.company",
+    "Website": "l.website",
+    "Email": "l.email",
+    "Keyword": "s.keyword",
+    "Category": "s.category",
+    "Wiedervorlage": "l.follow_up_date"
+}
+
+def get_user_leads(user_id, filter_status='active', keyword=None, category=None, sort_by="Date", descending=True, limit=None, offset=0):
     """
     filter_status: 'active' (default), 'deleted', 'all'
+    keyword / category: only leads of searches with this keyword / category
+    sort_by: a LEAD_SORT_COLUMNS key; limit/offset page through the result in SQL
+    Served from the lead frame cache until a write touches this user.
     """
+    key = ("leads", filter_status, keyword, category, sort_by, descending, limit, offset)
+    return _cached_frame(user_id, key, lambda: _query_user_leads(user_id, filter_status, keyword, category, sort_by, descending, limit, offset))
+
+def count_user_leads(user_id, filter_status='active', keyword=None, category=None):
+    """Number of leads matching the same filters as get_user_leads."""
+    def load():
+        where, params = _lead_filters(user_id, filter_status, keyword, category)
+        conn = get_connection()
+        count = conn.execute(f"SELECT COUNT(*) FROM leads l JOIN searches s ON l.search_id = s.id WHERE {where}", params).fetchone()[0]
+        conn.close()
+        return count
+    return _cached_frame(user_id, ("count", filter_status, keyword, category), load)
+
+def get_lead_filter_options(user_id):
+    """Distinct categories and keywords of the user's searches (for filter dropdowns)."""
+    def load():
+        conn = get_connection()
+        c = conn.cursor()
+        categories = tuple(r[0] for r in c.execute("SELECT DISTINCT category FROM searches WHERE user_id = ? AND category IS NOT NULL AND category != '' ORDER BY category", (user_id,)))
+        keywords = tuple(r[0] for r in c.execute("SELECT DISTINCT keyword FROM searches WHERE user_id = ? AND keyword IS NOT NULL AND TRIM(keyword) != '' ORDER BY keyword", (user_id,)))
+        conn.close()
+        return categories, keywords
+    return _cached_frame(user_id, ("filter_options",), load)
+
+def _lead_filters(user_id, filter_status, keyword, category):
+    """WHERE clause + params shared by the lead list and its count."""
+    where = "l.user_id = ?"
+    params = [user_id]
+    
+    if filter_status == 'active':
+        where += " AND (l.deleted = 0 OR l.deleted IS NULL)"
+    elif filter_status == 'deleted':
+        where += " AND l.deleted = 1"
+        
+    # Keyword / category match any search the lead was found by (lead_searches)
+    linked = "EXISTS (SELECT 1 FROM lead_searches ls JOIN searches ks ON ks.id = ls.search_id WHERE ls.lead_id = l.id AND ks.{} = ?)"
+    if keyword is not None:
+        where += " AND " + linked.format("keyword")
+        params.append(keyword)
+    if category is not None:
+        where += " AND " + linked.format("category")
+        params.append(category)
+    return where, params
+
+def _query_user_leads(user_id, filter_status, keyword, category, sort_by, descending, limit, offset):
+    where, params = _lead_filters(user_id, filter_status, keyword, category)
+    
+    # Stable order for paging: ties broken by id
+    direction = "DESC" if descending else "ASC"
+    order_col = LEAD_SORT_COLUMNS.get(sort_by, "l.timestamp")
+    return _read_leads(where, params, f"{order_col} {direction}, l.id {direction}", limit, offset)
+
+def _read_leads(where, params, order_by, limit=None, offset=0, source="leads l"):
+    """Runs the lead list SELECT (UI column aliases) for a WHERE/ORDER BY."""
     conn = get_connection()
-    query = '''
+    query = f'''
         SELECT 
             l.id as ID,
             l.company as Company, 
@@ -194,105 +936,210 @@ def get_user_leads(user_id, filter_status='active'):
             s.keyword as Keyword,
             s.category as Category,
             l.timestamp as Date
-        FROM leads l
+        FROM {source}
         JOIN searches s ON l.search_id = s.id
-        WHERE l.user_id = ?
+        WHERE {where}
+        ORDER BY {order_by}
     '''
+    params = list(params)
+    if limit is not None:
+        query += " LIMIT ? OFFSET ?"
+        params += [int(limit), int(offset)]
     
-    if filter_status == 'active':
-        query += " AND (l.deleted = 0 OR l.deleted IS NULL)"
-    elif filter_status == 'deleted':
-        query += " AND l.deleted = 1"
-        
-    query += " ORDER BY l.timestamp DESC"
-    
-    df = pd.read_sql_query(query, conn, params=(user_id,))
+    df = pd.read_sql_query(query, conn, params=params)
     conn.close()
     return df
 
+# To Do: active leads without Newsletter / Warenkorb / Kein NL.
+# Must match the WHERE of idx_leads_todo term by term, or SQLite skips the partial index.
+TODO_WHERE = """l.user_id = ?
+    AND COALESCE(l.newsletter_signup, 0) = 0
+    AND COALESCE(l.cart_abandoned, 0) = 0
+    AND COALESCE(l.no_newsletter, 0) = 0
+    AND COALESCE(l.deleted, 0) = 0"""
+
+# Wiedervorlage: active leads with a due date whose task isn't completed (see idx_leads_follow_up)
+FOLLOW_UP_WHERE = """l.user_id = ?
+    AND l.follow_up_date IS NOT NULL
+    AND l.follow_up_date != ''
+    AND COALESCE(l.follow_up_status, 'pending') != 'completed'
+    AND COALESCE(l.deleted, 0) = 0"""
+
+def get_open_todos(user_id, limit=None, offset=0):
+    """Unprocessed leads for the To Do page, newest first."""
+    key = ("todos", limit, offset)
+    return _cached_frame(user_id, key, lambda: _read_leads(TODO_WHERE, [user_id], "l.timestamp DESC, l.id DESC", limit, offset))
+
+def count_open_todos(user_id):
+    """Number of unprocessed leads (To Do metric)."""
+    def load():
+        conn = get_connection()
+        count = conn.execute(f"SELECT COUNT(*) FROM leads l WHERE {TODO_WHERE}", (user_id,)).fetchone()[0]
+        conn.close()
+        return count
+    return _cached_frame(user_id, ("todos_count",), load)
+
+def get_follow_ups(user_id, limit=None, offset=0):
+    """Pending follow-ups, oldest due date (= most overdue) first."""
+    key = ("follow_ups", limit, offset)
+    return _cached_frame(user_id, key, lambda: _read_leads(FOLLOW_UP_WHERE, [user_id], "l.follow_up_date ASC, l.id ASC", limit, offset))
+
+def count_follow_ups(user_id, today=None):
+    """Returns (open, overdue) follow-up counts; overdue = due before `today` (YYYY-MM-DD)."""
+    today = today or datetime.now().strftime('%Y-%m-%d')
+    def load():
+        conn = get_connection()
+        total, overdue = conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(l.follow_up_date < ?), 0) FROM leads l WHERE {FOLLOW_UP_WHERE}",
+            (today, user_id)
+        ).fetchone()
+        conn.close()
+        return total, overdue
+    return _cached_frame(user_id, ("follow_ups_count", today), load)
+
+def search_leads(user_id, query, filter_status='active', keyword=None, category=None, limit=100):
+    """
+    Full-text search over company, website, email and notes.
+    Every word of `query` must occur (substring match); hits are ranked by
+    relevance (bm25) and returned with the same columns as get_user_leads.
+    """
+    terms = query.split()
+    if not terms:
+        return get_user_leads(user_id, filter_status, keyword, category, limit=limit)
+    key = ("search", tuple(terms), filter_status, keyword, category, limit)
+    return _cached_frame(user_id, key, lambda: _query_search(user_id, terms, filter_status, keyword, category, limit))
+
+def _query_search(user_id, terms, filter_status, keyword, category, limit):
+    where, params = _lead_filters(user_id, filter_status, keyword, category)
+    conn = get_connection()
+    tokenizer = _lead_search_tokenizer(conn.cursor())
+    conn.close()
+    
+    # Trigrams can't match words shorter than 3 characters: those go through LIKE
+    if tokenizer == "unicode61" or (tokenizer == "trigram" and min(len(t) for t in terms) >= 3):
+        suffix = "*" if tokenizer == "unicode61" else "" # Prefix match on word tokens
+        match = " ".join('"' + t.replace('"', '""') + '"' + suffix for t in terms)
+        return _read_leads(
+            f"leads_fts MATCH ? AND {where}", [match] + params, "bm25(leads_fts), l.id DESC", limit,
+            source="leads_fts JOIN leads l ON l.id = leads_fts.rowid"
+        )
+    
+    # Fallback (no FTS5 / very short terms): LIKE over the same columns, newest first
+    for term in terms:
+        pattern = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        where += " AND (" + " OR ".join(f"l.{col} LIKE ? ESCAPE '\\'" for col in SEARCH_COLUMNS) + ")"
+        params += [pattern] * len(SEARCH_COLUMNS)
+    return _read_leads(where, params, "l.timestamp DESC, l.id DESC", limit)
+
+# UI column (get_user_leads aliases) -> leads column
+LEAD_COLUMN_MAP = {
+    "Trash": "deleted",
+    "Grund": "deletion_reason",
+    "Newsletter": "newsletter_signup",
+    "Kein NL": "no_newsletter",
+    "Warenkorb": "cart_abandoned",
+    "Angeschrieben": "email_sent",
+    "Antwort": "response_received",
+    "Kunde": "converted",
+    "Notizen": "notes",
+    "Wiedervorlage": "follow_up_date",
+    "Aufgabe": "follow_up_reason",
+    "Status": "follow_up_status"
+}
+
+# Checking one of these schedules a follow-up in 7 days
+FOLLOW_UP_REASONS = {
+    "newsletter_signup": "Newsletter Check (7 Tage)",
+    "cart_abandoned": "Warenkorb Check (7 Tage)"
+}
+
 def update_lead(lead_id, column, value):
+    """Single-cell update. Prefer update_leads() for whole editor change sets."""
+    summary = update_leads({lead_id: {column: value}})
+    return summary["cells"] == 1 and not summary["error"]
+
+def update_leads(changes):
+    """
+    Batch update: applies {lead_id: {column: value}} in one transaction.
+    Columns may be UI names (see LEAD_COLUMN_MAP) or raw leads columns.
+    Returns a summary: leads/cells updated, follow-ups scheduled, skipped cells.
+    """
+    summary = {"leads": 0, "cells": 0, "follow_ups": 0, "skipped": [], "error": None}
+    if not changes:
+        return summary
+        
     conn = get_connection()
     c = conn.cursor()
+    valid_columns = {row["name"] for row in c.execute("PRAGMA table_info(leads)")} - {"id"}
     
-    # Ensure ID is native int (crucial for SQLite matching)
-    lead_id = int(lead_id)
+    # 1. Resolve column mapping & value casting for the whole edit set
+    grouped = {} # column tuple -> rows for one executemany
+    follow_ups = []
+    due_date = (datetime.now() + timedelta(days=7)).strftime('%Y-%m-%d')
     
-    try:
-        if column == 'Trash':
-            # Map 'Trash' UI column to 'deleted' DB column
-            # Ensure proper boolean/int casting
-            val = 1 if value else 0
-            c.execute("UPDATE leads SET deleted = ? WHERE id = ?", (val, lead_id))
-        elif column == 'Grund':
-            c.execute("UPDATE leads SET deletion_reason = ? WHERE id = ?", (value, lead_id))
-        else:
-            # Map friendly names to DB columns
-            db_col = {
-                "Newsletter": "newsletter_signup",
-                "Kein NL": "no_newsletter",
-                "Warenkorb": "cart_abandoned",
-                "Angeschrieben": "email_sent",
-                "Antwort": "response_received",
-                "Kunde": "converted",
-                "Notizen": "notes"
-            }.get(column, column) # Default to original if no mapping
-            
-            # Handle booleans for generic columns
-            if isinstance(value, bool):
-                value = 1 if value else 0
+    for lead_id, updates in changes.items():
+        # Ensure ID is native int (crucial for SQLite matching)
+        lead_id = int(lead_id)
+        assignments = {}
+        
+        for column, value in updates.items():
+            db_col = LEAD_COLUMN_MAP.get(column, column) # Default to original if no mapping
+            if db_col not in valid_columns:
+                summary["skipped"].append((lead_id, column))
+                continue
                 
-            query = f"UPDATE leads SET {db_col} = ? WHERE id = ?"
-            c.execute(query, (value, lead_id))
+            # Handle booleans ('deleted' also accepts any truthy value)
+            if db_col == "deleted":
+                value = 1 if value else 0
+            elif isinstance(value, bool):
+                value = 1 if value else 0
+            assignments[db_col] = value
             
             # --- Follow-up Logic (Side Effects) ---
-            if value == 1: # Only if checked (True)
-                reason = None
-                if column == "Newsletter":
-                    reason = "Newsletter Check (7 Tage)"
-                elif column == "Warenkorb":
-                    reason = "Warenkorb Check (7 Tage)"
-                
-                if reason:
-                    due_date = (datetime.now() + timedelta(days=7)).strftime('%Y-%m-%d')
-                    c.execute(
-                        "UPDATE leads SET follow_up_date = ?, follow_up_reason = ?, follow_up_status = 'pending' WHERE id = ?",
-                        (due_date, reason, lead_id)
-                    )
-            # --------------------------------------
+            if value == 1 and db_col in FOLLOW_UP_REASONS: # Only if checked (True)
+                follow_ups.append((due_date, FOLLOW_UP_REASONS[db_col], lead_id))
+        
+        if assignments:
+            columns = tuple(sorted(assignments))
+            grouped.setdefault(columns, []).append(tuple(assignments[col] for col in columns) + (lead_id,))
+            summary["leads"] += 1
+            summary["cells"] += len(assignments)
+    
+    # 2. Apply everything in one transaction
+    try:
+        for columns, rows in grouped.items():
+            set_clause = ", ".join(f"{col} = ?" for col in columns)
+            c.executemany(f"UPDATE leads SET {set_clause} WHERE id = ?", rows)
             
+        if follow_ups:
+            c.executemany(
+                "UPDATE leads SET follow_up_date = ?, follow_up_reason = ?, follow_up_status = 'pending' WHERE id = ?",
+                follow_ups
+            )
+        summary["follow_ups"] = len(follow_ups)
+        
         conn.commit()
-        return True
+        _invalidate_for_leads(c, [int(lead_id) for lead_id in changes])
     except Exception as e:
+        conn.rollback()
         print(f"Update error: {e}")
-        return False
+        summary.update({"leads": 0, "cells": 0, "error": str(e)})
     finally:
         conn.close()
+    return summary
 
 def get_dashboard_stats(user_id):
     conn = get_connection()
     c = conn.cursor()
     
-    stats = {}
-    
-    # Total Leads
-    c.execute("SELECT COUNT(*) FROM leads WHERE user_id = ?", (user_id,))
-    stats["total_leads"] = c.fetchone()[0]
-    
-    # Newsletter Signups
-    c.execute("SELECT COUNT(*) FROM leads WHERE user_id = ? AND newsletter_signup = 1", (user_id,))
-    stats["newsletter_signups"] = c.fetchone()[0]
-    
-    # Emails Sent
-    c.execute("SELECT COUNT(*) FROM leads WHERE user_id = ? AND email_sent = 1", (user_id,))
-    stats["emails_sent"] = c.fetchone()[0]
-    
-    # Responses
-    c.execute("SELECT COUNT(*) FROM leads WHERE user_id = ? AND response_received = 1", (user_id,))
-    stats["responses"] = c.fetchone()[0]
+    # Lead counters (O(1): maintained by triggers, see ensure_lead_stats)
+    counters = list(STAT_COUNTERS.values())
+    c.execute(f"SELECT total_leads, {', '.join(counters)} FROM lead_stats WHERE user_id = ?", (user_id,))
+    row = c.fetchone()
     
-    # Conversions
-    c.execute("SELECT COUNT(*) FROM leads WHERE user_id = ? AND converted = 1", (user_id,))
-    stats["conversions"] = c.fetchone()[0]
+    stats = {"total_leads": row["total_leads"] if row else 0}
+    for counter in counters:
+        stats[counter] = row[counter] if row else 0
     
     # Top Keywords
     c.execute("SELECT keyword, COUNT(*) as count FROM searches WHERE user_id = ? GROUP BY keyword ORDER BY count DESC LIMIT 5", (user_id,))
@@ -313,4 +1160,8 @@ def update_search_category(search_id, category):
     c = conn.cursor()
     c.execute("UPDATE searches SET category = ? WHERE id = ?", (category, search_id))
     conn.commit()
+    # Category is part of the lead frames of the search's owner
+    row = c.execute("SELECT user_id FROM searches WHERE id = ?", (search_id,)).fetchone()
     conn.close()
+    if row:
+        invalidate_lead_cache(row[0])
\ No newline at end of file
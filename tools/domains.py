@@ -0,0 +1,18 @@
+from urllib.parse import urlparse
+
+def normalize_domain(url):
+    """
+    Reduces a URL or bare domain to a canonical host key.
+    'https://www.Shop.de/products?id=1' -> 'shop.de'
+    """
+    if not url:
+        return None
+    url = str(url).strip()
+    if "://" not in url:
+        url = "https://" + url
+
+    host = urlparse(url).netloc.lower()
+    host = host.split("@")[-1].split(":")[0].strip(".") # Drop credentials & port
+    if host.startswith("www."):
+        host = host[4:]
+    return host or None
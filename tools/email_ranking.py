@@ -0,0 +1,98 @@
+import re
+from tools.domains import normalize_domain
+
+# Points per signal; a candidate reaching HIGH_CONFIDENCE ends the crawl of its site
+SOURCE_SCORES = {"mailto": 3, "obfuscated": 2, "text": 1} # Obfuscated = deliberately published for humans
+SAME_DOMAIN_SCORE = 4
+FREEMAIL_SCORE = 1 # Small shops often use their GMX/Gmail address
+ROLE_SCORE = 2
+HIGH_CONFIDENCE = 7 # e.g. mailto on the shop's own domain, or info@<shop domain> in the text
+
+ROLE_NAMES = {
+    "info", "kontakt", "contact", "hallo", "hello", "hi", "mail", "post", "office", "buero", "team",
+    "service", "kundenservice", "customerservice", "support", "shop", "store", "sales", "vertrieb",
+    "order", "orders", "bestellung", "anfrage", "inquiry", "business", "partner", "marketing", "presse", "press"
+}
+
+FREEMAIL_DOMAINS = {
+    "gmail.com", "googlemail.com", "gmx.de", "gmx.net", "gmx.at", "gmx.ch", "web.de", "t-online.de",
+    "outlook.com", "outlook.de", "hotmail.com", "hotmail.de", "live.de", "yahoo.com", "yahoo.de",
+    "icloud.com", "me.com", "aol.com", "freenet.de", "posteo.de", "mail.de", "protonmail.com", "proton.me"
+}
+
+# Never a contact address
+ASSET_SUFFIXES = (
+    ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".avif", ".ico", ".bmp", ".tif", ".tiff",
+    ".css", ".js", ".json", ".woff", ".woff2", ".mp4", ".webm", ".pdf"
+) # "logo@2x.png", "icon@3x.webp"
+PLACEHOLDER_DOMAINS = {
+    "example.com", "example.org", "example.net", "example.de", "domain.com", "domain.de", "email.com",
+    "yourdomain.com", "your-domain.com", "ihredomain.de", "ihre-domain.de", "deinedomain.de",
+    "mustermann.de", "musterfirma.de", "beispiel.de", "test.com", "test.de"
+}
+PLACEHOLDER_NAMES = {
+    "name", "email", "e-mail", "your", "yourname", "your.name", "ihre", "ihr.name", "deine", "vorname.nachname",
+    "max.mustermann", "maxmustermann", "mustermann", "firstname.lastname", "john.doe", "jane.doe", "test", "user", "username"
+}
+TRACKING_DOMAINS = (
+    "sentry.io", "wixpress.com", "sentry-next.wixpress.com", "bugsnag.com", "mixpanel.com", "hotjar.com",
+    "list-manage.com", "sendgrid.net", "amazonses.com", "klaviyomail.com", "mailchimp.com"
+)
+NO_REPLY = re.compile(r"^(?:no-?reply|do-?not-?reply|donotreply|mailer-daemon|bounces?)\b")
+HASH_NAME = re.compile(r"^[0-9a-f]{16,}$") # Sentry DSN keys and other tracking IDs
+
+def score_email(email, source, site_domain=None):
+    """
+    Scores one candidate found on a site (higher is better), None if it's
+    not a contact address: asset file names, placeholders, no-reply and
+    tracking addresses. Signals: same domain as the site, role address
+    (info@, kontakt@, ...) and where it was found (mailto: > obfuscated > text).
+    """
+    email = email.strip().lower()
+    name, _, domain = email.rpartition("@")
+    if not name or not domain or domain.endswith(ASSET_SUFFIXES):
+        return None
+    same_site = bool(site_domain) and (domain == site_domain or domain.endswith("." + site_domain) or site_domain.endswith("." + domain))
+    if not same_site and (domain in PLACEHOLDER_DOMAINS or name in PLACEHOLDER_NAMES):
+        return None
+    if NO_REPLY.match(name) or HASH_NAME.match(name) or any(domain == t or domain.endswith("." + t) for t in TRACKING_DOMAINS):
+        return None
+
+    score = SOURCE_SCORES.get(source, 1)
+    if same_site:
+        score += SAME_DOMAIN_SCORE
+    elif domain in FREEMAIL_DOMAINS:
+        score += FREEMAIL_SCORE
+    if re.split(r"[.+_-]", name)[0] in ROLE_NAMES:
+        score += ROLE_SCORE
+    return score
+
+class EmailRanking:
+    """
+    Collects the candidates of one site across its pages (homepage,
+    Impressum, Kontakt, ...) and keeps the best one. add() returns True once
+    the best candidate is high confidence, so the crawl can stop there.
+    """
+    def __init__(self, site_url, threshold=HIGH_CONFIDENCE):
+        self.site_domain = normalize_domain(site_url)
+        self.threshold = threshold
+        self.scores = {} # email -> best score
+        self.best = None
+
+    def add(self, email, source):
+        score = score_email(email, source, self.site_domain)
+        if score is not None:
+            email = email.strip().lower()
+            if score > self.scores.get(email, -1):
+                self.scores[email] = score
+            if self.best is None or score > self.scores[self.best]:
+                self.best = email
+        return self.confident
+
+    @property
+    def confident(self):
+        return self.best is not None and self.scores[self.best] >= self.threshold
+
+    def ranked(self):
+        """(email, score), best first (ties: first found)."""
+        return sorted(self.scores.items(), key=lambda item: -item[1])
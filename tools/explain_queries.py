@@ -0,0 +1,105 @@
+import os
+import shutil
+import sys
+import tempfile
+import pandas as pd
+import tools.database as db
+
+# Every public query function in tools/database.py, called with sample arguments.
+# Add new query functions here so their plans are audited too.
+QUERY_CALLS = [
+    ("verify_user", lambda: db.verify_user("admin", "admin123")),
+    ("get_user_leads (active)", lambda: db.get_user_leads(1)),
+    ("get_user_leads (deleted)", lambda: db.get_user_leads(1, filter_status='deleted')),
+    ("get_user_leads (all)", lambda: db.get_user_leads(1, filter_status='all')),
+    ("get_user_leads (keyword)", lambda: db.get_user_leads(1, keyword="explain")),
+    ("get_user_leads (page)", lambda: db.get_user_leads(1, category="Sonstiges", limit=50, offset=50)),
+    ("count_user_leads", lambda: db.count_user_leads(1, keyword="explain")),
+    ("get_lead_filter_options", lambda: db.get_lead_filter_options(1)),
+    ("get_open_todos", lambda: db.get_open_todos(1, limit=200)),
+    ("count_open_todos", lambda: db.count_open_todos(1)),
+    ("get_follow_ups", lambda: db.get_follow_ups(1)),
+    ("count_follow_ups", lambda: db.count_follow_ups(1)),
+    ("search_leads", lambda: db.search_leads(1, "shop1")),
+    ("search_leads (short term)", lambda: db.search_leads(1, "de")),
+    ("save_lead", lambda: db.save_lead(1, 1, {"Company": "Explain", "Website": "https://explain.de"})),
+    ("save_lead (known domain)", lambda: db.save_lead(1, 1, {"Company": "Shop 1", "Website": "https://www.shop1.de"})),
+    ("get_known_domains", lambda: db.get_known_domains(1)),
+    ("link_known_leads", lambda: db.link_known_leads(1, 1, ["shop2.de", "shop3.de"])),
+    ("update_lead", lambda: db.update_lead(1, "Notizen", "explain")),
+    ("update_leads", lambda: db.update_leads({1: {"Newsletter": True}, 2: {"Trash": True, "Grund": "explain"}})),
+    ("get_dashboard_stats", lambda: db.get_dashboard_stats(1)),
+    ("get_resumable_apify_run", lambda: db.get_resumable_apify_run("explain", "DE", 20)),
+    ("get_searches", lambda: db.get_searches(1)),
+    ("update_search_category", lambda: db.update_search_category(1, "Sonstiges")),
+]
+
+QUERY_PREFIXES = ("SELECT", "UPDATE", "DELETE", "WITH")
+AUDITED_TABLES = ("leads", "searches")
+
+def _seed():
+    search_id = db.create_search(1, "explain", "DE")
+    db.save_leads_bulk(1, search_id, pd.DataFrame([
+        {"Company": f"Shop {i}", "Website": f"https://shop{i}.de", "Email": f"info@shop{i}.de"}
+        for i in range(50)
+    ]))
+
+def _is_full_scan(detail):
+    """'SCAN leads' / 'SCAN l' without an index is a full table scan (FTS lookups are not)."""
+    detail = detail.strip()
+    if not detail.startswith("SCAN ") or " USING " in detail or " VIRTUAL TABLE INDEX " in detail:
+        return False
+    return True
+
+def explain_all():
+    """
+    Runs every query function against a throwaway database, captures the
+    executed SQL and prints its EXPLAIN QUERY PLAN.
+    Returns the list of (function, sql, plan line) full table scans.
+    """
+    statements = []
+    tmp_dir = tempfile.mkdtemp()
+    original_db = db.DB_FILE
+    db.DB_FILE = os.path.join(tmp_dir, "explain.db")
+    try:
+        db.init_db()
+        _seed()
+
+        for name, call in QUERY_CALLS:
+            captured = []
+            db.invalidate_lead_cache() # Force real queries instead of cached frames
+            db.set_trace_callback(captured.append)
+            try:
+                call()
+            finally:
+                db.set_trace_callback(None)
+            for sql in captured:
+                if sql.lstrip().upper().startswith(QUERY_PREFIXES):
+                    statements.append((name, sql))
+
+        regressions = []
+        conn = db.get_connection()
+        for name, sql in statements:
+            print(f"\n=== {name} ===")
+            print(" ".join(sql.split()))
+            for row in conn.execute("EXPLAIN QUERY PLAN " + sql):
+                detail = row["detail"]
+                flag = ""
+                if _is_full_scan(detail) and any(t in sql for t in AUDITED_TABLES):
+                    flag = "   <-- FULL SCAN"
+                    regressions.append((name, sql, detail))
+                print(f"  {detail}{flag}")
+        conn.close()
+        return regressions
+    finally:
+        db.close_connections()
+        db.DB_FILE = original_db
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    found = explain_all()
+    print()
+    if found:
+        print(f"❌ {len(found)} full table scan(s) found.")
+        sys.exit(1)
+    print("✅ All queries use indexes.")
@@ -1,12 +1,23 @@
 import os
 from apify_client import ApifyClient
 from dotenv import load_dotenv
+import time
 import urllib.parse
+import tools.database as db
 
 load_dotenv()
 
+# Note: Using 'curious_coder/facebook-ads-library-scraper' (Cheaper: ~$0.75-1.25/1000)
+ACTOR_ID = "curious_coder/facebook-ads-library-scraper"
+TERMINAL_STATES = ("SUCCEEDED",) + db.APIFY_FAILED_STATES
+
 class MetaClient:
-    def __init__(self):
+    def __init__(self, client=None):
+        """`client`: any ApifyClient-compatible object (e.g. tools.apify_fake.FakeApifyClient)."""
+        self._read_runs = [] # Streamed to the end, see finish_runs()
+        if client is not None:
+            self.client = client
+            return
         token = os.getenv("APIFY_TOKEN")
         if not token:
             raise ValueError("APIFY_TOKEN not found in .env")
@@ -18,36 +29,11 @@ class MetaClient:
         Constructs a direct URL to satisfy 'startUrls' requirement.
         """
         print(f"🔍 Searching Meta Ads for keywords: {keywords} in {country}...")
-        
-        start_urls = []
-        for keyword in keywords:
-            # Construct the Ad Library URL
-            params = {
-                "active_status": "active", # Only active ads for lead gen
-                "ad_type": "all",
-                "country": country,
-                "q": keyword,
-                "sort_data[direction]": "desc",
-                "sort_data[mode]": "relevance_monthly_grouped",
-                "search_type": "keyword_unordered",
-                "media_type": "all"
-            }
-            query_string = urllib.parse.urlencode(params)
-            url = f"https://www.facebook.com/ads/library/?{query_string}"
-            start_urls.append({"url": url})
-            print(f"🔗 Generated URL: {url}")
-
-        # Input for curious_coder/facebook-ads-library-scraper
-        # Schema: { "urls": [ { "url": "..." } ], "count": int }
-        run_input = {
-            "urls": start_urls,
-            "count": max_results,
-        }
+        run_input = self._run_input(keywords, country, max_results)
 
-        # Run the actor
-        # Note: Using 'curious_coder/facebook-ads-library-scraper' (Cheaper: ~$0.75-1.25/1000)
+        # Run the actor (blocks until the run has finished)
         print("🚀 Sending request to Apify (Curious Coder)...")
-        run = self.client.actor("curious_coder/facebook-ads-library-scraper").call(run_input=run_input)
+        run = self.client.actor(ACTOR_ID).call(run_input=run_input)
 
         if not run:
             print("❌ Apify run failed to start.")
@@ -64,6 +50,114 @@ class MetaClient:
         print(f"✅ Found {len(dataset_items)} ads.")
         return dataset_items
 
+    def stream_ads(self, queries, max_results=50, poll_interval=5.0, page_size=100, resume=True, batches=False, stop=None):
+        """
+        Non-blocking mode: starts one actor run per (keyword, country) pair,
+        then polls all runs and yields dataset items as soon as they appear
+        (tagged with their pair as "searchKeyword"/"searchCountry" plus
+        "searchRunId", so leads keep their source), instead of waiting for
+        the runs to finish.
+
+        Run IDs are stored in the apify_runs table. With resume=True an
+        unfinished earlier run of the same query (crashed or reloaded session)
+        is read again from the start of its dataset instead of starting a
+        paid new run (shops already saved are skipped as known domains).
+        With batches=True every dataset page is yielded as one list (for the
+        vectorized extraction). Call finish_runs() once every yielded ad has
+        been processed. Setting `stop` (threading.Event) ends the polling
+        within one poll instead of waiting for the next ad.
+        """
+        runs = []
+        for keyword, country in _clean_queries(queries):
+            known = db.get_resumable_apify_run(keyword, country, max_results) if resume else None
+            if known:
+                print(f"♻️ Resuming Apify run {known['run_id']} for '{keyword}' ({country})")
+                run_id, dataset_id, status = known["run_id"], known["dataset_id"], known["status"]
+            else:
+                print(f"🔍 Starting Meta Ads search for '{keyword}' in {country}...")
+                run = self.client.actor(ACTOR_ID).start(run_input=self._run_input([keyword], country, max_results))
+                run_id, dataset_id, status = run["id"], run["defaultDatasetId"], run["status"]
+                db.save_apify_run(run_id, keyword, country, max_results, dataset_id, status)
+                print(f"RUN URL: https://console.apify.com/view/runs/{run_id}")
+            runs.append({"id": run_id, "dataset": dataset_id, "keyword": keyword, "country": country, "offset": 0, "status": status})
+
+        # Poll round-robin: status first, then read, so the read after a
+        # terminal status is guaranteed to see the complete dataset
+        while runs and not (stop and stop.is_set()):
+            new_items = 0
+            for run in list(runs):
+                if stop and stop.is_set():
+                    return
+                status = self.client.run(run["id"]).get()["status"]
+                page = self.client.dataset(run["dataset"]).list_items(offset=run["offset"], limit=page_size)
+                for item in page.items:
+                    item["searchKeyword"] = run["keyword"]
+                    item["searchCountry"] = run["country"]
+                    item["searchRunId"] = run["id"]
+                if page.items:
+                    if batches:
+                        yield page.items
+                    else:
+                        yield from page.items
+                run["offset"] += len(page.items)
+                new_items += len(page.items)
+
+                if status != run["status"]:
+                    db.update_apify_run(run["id"], status)
+                    run["status"] = status
+                if status in TERMINAL_STATES and len(page.items) < page_size:
+                    runs.remove(run)
+                    if status != "SUCCEEDED":
+                        print(f"⚠️ Apify run {run['id']} ended with {status} ({run['offset']} ads).")
+                    else:
+                        self._read_runs.append(run["id"])
+                        print(f"✅ '{run['keyword']}' ({run['country']}): {run['offset']} ads.")
+
+            if runs and not new_items: # Nothing new yet: don't hammer the API
+                if stop:
+                    stop.wait(poll_interval)
+                else:
+                    time.sleep(poll_interval)
+
+    def finish_runs(self):
+        """Marks the runs streamed to the end as consumed, so they aren't resumed."""
+        db.mark_apify_runs_consumed(self._read_runs)
+        self._read_runs = []
+
+    def _run_input(self, keywords, country, max_results):
+        """Input for curious_coder/facebook-ads-library-scraper."""
+        start_urls = []
+        for keyword in keywords:
+            url = self.ad_library_url(keyword, country)
+            start_urls.append({"url": url})
+            print(f"🔗 Generated URL: {url}")
+
+        # Schema: { "urls": [ { "url": "..." } ], "count": int }
+        return {
+            "urls": start_urls,
+            "count": max_results,
+        }
+
+    @staticmethod
+    def ad_library_url(keyword, country):
+        """Ad Library search URL for one keyword (input for the actor)."""
+        params = {
+            "active_status": "active", # Only active ads for lead gen
+            "ad_type": "all",
+            "country": country,
+            "q": keyword,
+            "sort_data[direction]": "desc",
+            "sort_data[mode]": "relevance_monthly_grouped",
+            "search_type": "keyword_unordered",
+            "media_type": "all"
+        }
+        query_string = urllib.parse.urlencode(params)
+        return f"https://www.facebook.com/ads/library/?{query_string}"
+
+def _clean_queries(queries):
+    """Strips, upper-cases countries and drops empty/duplicate (keyword, country) pairs."""
+    return list(dict.fromkeys((k.strip(), c.strip().upper()) for k, c in queries if k and k.strip()))
+
 if __name__ == "__main__":
     # Remove one keyword to save credits/time during test
     client = MetaClient()
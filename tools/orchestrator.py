@@ -1,17 +1,135 @@
 import pandas as pd
+import csv
 from tools.meta_client import MetaClient
 from tools.website_walker import WebsiteWalker
+from tools.crawl_cache import CrawlCache
+from tools.ad_archive import AdArchive
+from tools.ad_extraction import URL_IN_TEXT, extract_batch
 import time
 import re
+import threading
 
 def extract_domain(text):
     """Simple regex to find a domain in text if no direct link exists."""
     if not text: return None
-    match = re.search(r'(https?://[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})', text)
+    match = re.search(URL_IN_TEXT, text)
     if match:
         return match.group(1)
     return None
 
+def extract_candidates(batches, stats, known_domains=None):
+    """
+    Extraction stage: turns batches of raw Apify ads into deduplicated lead
+    dicts (Email still None) without any network call, so it also runs over
+    archived ads (replay_extraction). Each batch is filtered in one go
+    (tools.ad_extraction.extract_batch: columnar for replay-sized batches,
+    per ad for live dataset pages) before anything is crawled.
+    Counters go to `stats` (see iter_leads).
+    """
+    seen = {} # domain -> (keyword, country) that queued it first
+    for batch in batches:
+        leads = list(extract_batch(batch, stats, known_domains, seen))
+        if not leads:
+            continue
+        print(f"🔎 Queued {len(leads)} new shops ({stats['queued']} so far)")
+        yield from leads
+
+def _init_stats(stats):
+    if stats is None:
+        stats = {}
+    stats.update({
+        "fetched": 0,
+        "duplicates": 0,
+        "no_website": 0,
+        "known": 0,
+        "links": [],
+        "queued": 0,
+        "processed": 0
+    })
+    return stats
+
+def iter_leads(keywords=None, country="DE", max_results=20, stats=None, known_domains=None, queries=None, client=None, poll_interval=5.0, archive=None):
+    """
+    Streaming lead pipeline: yields each enriched lead (dict) as soon as its
+    website crawl finishes, so callers can persist and display it right away.
+    Pass a dict as `stats` to follow progress ("queued" vs. "processed").
+
+    `queries` is a batch of (keyword, country) pairs searched in parallel
+    (default: every keyword in `country`); all ads share one deduplicated
+    crawl and each lead carries the Keyword/Country that found it.
+    Shops in `known_domains` (normalized, e.g. database.get_known_domains)
+    are not crawled again. Skipped shops (known, or already queued by another
+    pair) are listed in stats["links"] as (website, keyword, country).
+
+    Apify runs are started without blocking and their ads are crawled while
+    the runs are still scraping (MetaClient.stream_ads); `client` replaces
+    the Apify client (e.g. tools.apify_fake.FakeApifyClient for offline runs).
+    Every raw ad is kept in the AdArchive (`archive`, default ad_archive/).
+    """
+    if queries is None:
+        KEYWORDS = keywords if isinstance(keywords, list) else [keywords]
+        queries = [(keyword, country) for keyword in KEYWORDS]
+    stats = _init_stats(stats)
+
+    # Let exceptions propagate to app.py for UI feedback
+    meta = MetaClient(client=client)
+    walker = WebsiteWalker(cache=CrawlCache())
+    owns_archive = archive is None
+    archive = archive or AdArchive()
+    by_website = {} # website -> lead waiting for its crawl
+    stop = threading.Event() # Set when the caller stops early: ends the Apify polling right away
+
+    def queue_candidates(batches):
+        for lead in extract_candidates(batches, stats, known_domains):
+            by_website[lead["Website"]] = lead
+            yield lead["Website"]
+
+    try:
+        # 1. Stream Ads (one non-blocking actor run per keyword/country)
+        batches = archive.record_batches(meta.stream_ads(queries, max_results=max_results, poll_interval=poll_interval, batches=True, stop=stop))
+
+        # 2. Extract & Deduplicate, 3. Find Emails (The "Anti-Gravity" Step via WebsiteWalker)
+        # Crawls start while the runs are still scraping; each lead is
+        # yielded as soon as its crawl is done (completion order, not ad order).
+        for website_url, email in walker.find_emails(queue_candidates(batches), stop=stop):
+            processed_data = by_website[website_url]
+            processed_data["Email"] = email if email else "Not Found"
+            stats["processed"] += 1
+            print(f"   -> {website_url}: {email}")
+            yield processed_data
+
+        meta.finish_runs() # Every ad is processed: don't resume these runs again
+        if not stats["fetched"]:
+            print("⚠️ No ads found.")
+        print(f"🔌 Connection reuse: {walker.connection_stats()}")
+        print(f"📥 Downloads: {walker.download_stats()}")
+        print(f"💾 Crawl cache: {walker.cache.stats()}")
+    finally:
+        walker.close()
+        walker.cache.close()
+        if owns_archive:
+            archive.close()
+        else:
+            archive.flush()
+
+REPLAY_BATCH_SIZE = 5000 # Archived ads per extraction batch
+
+def replay_extraction(keyword=None, country=None, run_id=None, archive=None, known_domains=None):
+    """
+    Re-runs the extraction stage over archived raw ads (no Apify, no crawl).
+    Returns (DataFrame of leads without emails, stats).
+    """
+    stats = _init_stats(None)
+    owns_archive = archive is None
+    archive = archive or AdArchive()
+    try:
+        batches = archive.iter_ads(keyword, country, run_id, batch_size=REPLAY_BATCH_SIZE)
+        leads = list(extract_candidates(batches, stats, known_domains))
+    finally:
+        if owns_archive:
+            archive.close()
+    return pd.DataFrame(leads), stats
+
 def main(keywords=None, country="DE", max_results=20):
     print("🚀 Starting Lead Generation System...")
     
@@ -28,114 +146,28 @@ def main(keywords=None, country="DE", max_results=20):
         KEYWORDS = keywords if isinstance(keywords, list) else [keywords]
         COUNTRY = country
     
-    # max_results is passed directly
-    
-    # 2. Initialize Tools
-    # 3. Initialize Tools
-    # Let exceptions propagate to app.py for UI feedback
-    meta = MetaClient()
-    walker = WebsiteWalker()
-    
-    # 3. Fetch Ads
-    ads = meta.fetch_ads(KEYWORDS, country=COUNTRY, max_results=max_results)
-    
-    if not ads:
-        print("⚠️ No ads found. Exiting.")
-        return pd.DataFrame(), {}
-
-    # 4. Process Leads
+    # 2. Stream leads, writing each CSV row as it arrives (survives crashes)
     leads = []
-    processed_domains = set()
-    stats = {
-        "fetched": len(ads),
-        "duplicates": 0,
-        "no_website": 0,
-        "processed": 0
-    }
-    
-    print(f"🔄 Processing {len(ads)} raw ads...")
-    
-    for ad in ads:
-        # Extract basic info (Adapting to Apify's schema)
-        # Check for different possible keys from various scrapers
-        snapshot = ad.get("snapshot", {})
-        page_name = snapshot.get("pageName") or snapshot.get("page_name") or ad.get("pageName") or ad.get("page_name") or "Unknown"
-        
-        # Try to find the website URL
-        # Priority 1: Direct Link URL (CTA) from snapshot
-        website_url = snapshot.get("linkUrl") or snapshot.get("link_url")
-        
-        # Ad Image extraction (New)
-        ad_image = None
-        images = snapshot.get("images", [])
-        if images and len(images) > 0:
-             ad_image = images[0].get("original_image_url") or images[0].get("resized_image_url")
-        
-        if not ad_image:
-             cards = snapshot.get("cards", [])
-             if cards and len(cards) > 0:
-                 ad_image = cards[0].get("original_image_url") or cards[0].get("resized_image_url")
-
-        # Priority 2: Cards (Carousel links)
-        if not website_url:
-            cards = snapshot.get("cards", [])
-            if cards and isinstance(cards, list) and len(cards) > 0:
-                # Check first card for link
-                website_url = cards[0].get("linkUrl") or cards[0].get("link_url")
-        
-        # Priority 3: Extract from body text
-        if not website_url:
-            body = snapshot.get("body", {})
-            body_text = body.get("text", "") if isinstance(body, dict) else str(body)
-            # Some scrapers put body directly as string in 'body' or 'title'
-            if not body_text:
-                 body_text = snapshot.get("title", "") or ad.get("ad_creative_body", "")
-            website_url = extract_domain(body_text)
-            
-        # Clean URL and Deduplicate
-        if website_url:
-            # Remove query params for domain checking
-            if not isinstance(website_url, str):
-                 website_url = str(website_url)
-            
-            clean_domain = website_url.split("?")[0].replace("https://", "").replace("http://", "").split("/")[0]
-            if clean_domain.lower() in ["facebook.com", "www.facebook.com", "instagram.com", "www.instagram.com"]:
-                 stats["no_website"] += 1
-                 continue 
-                 
-            if clean_domain in processed_domains:
-                stats["duplicates"] += 1
-                continue # Skip duplicates
-            processed_domains.add(clean_domain)
-        else:
-            stats["no_website"] += 1
-            continue # Skip ads without a website
-            
-        print(f"🔎 Analyzing: {page_name} ({website_url})")
-
-        # 5. Find Email (The "Anti-Gravity" Step via WebsiteWalker)
-        email = walker.find_email(website_url)
-        
-        processed_data = {
-            "Company": page_name,
-            "Website": website_url,
-            "Email": email if email else "Not Found",
-            "Ad URL": ad.get("ad_archive_url") or ad.get("adArchiveUrl") or ad.get("snapshotUrl") or ad.get("ad_library_url"),
-            "Ad Image": ad_image, # New field
-            "Keyword": KEYWORDS[0] 
-        }
-        
-        leads.append(processed_data)
-        stats["processed"] += 1
-        print(f"   -> Found Email: {email}")
+    stats = {}
+    filename = "leads.csv"
+    f = None
+    try:
+        for lead in iter_leads(KEYWORDS, country=COUNTRY, max_results=max_results, stats=stats):
+            if f is None:
+                f = open(filename, "w", newline="", encoding="utf-8")
+                writer = csv.DictWriter(f, fieldnames=list(lead.keys()))
+                writer.writeheader()
+            writer.writerow(lead)
+            f.flush()
+            leads.append(lead)
+    finally:
+        if f:
+            f.close()
 
-    # 6. Export to CSV
+    # 3. Return the collected result
     if leads:
-        df = pd.DataFrame(leads)
-        filename = "leads.csv"
-        df.to_csv(filename, index=False)
         print(f"✅ Saved {len(leads)} leads to {filename}")
-        return df, stats # Returning Tuple now
+        return pd.DataFrame(leads), stats # Returning Tuple now
     else:
         print("⚠️ No valid leads extracted.")
         return pd.DataFrame(), stats
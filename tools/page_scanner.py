@@ -0,0 +1,246 @@
+import re
+from html.parser import HTMLParser
+from urllib.parse import unquote, urljoin, urlparse
+
+try:
+    from lxml import etree # Optional: C parser, ~several times faster than html.parser
+except ImportError:
+    etree = None
+
+EMAIL_PATTERN = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+
+# Obfuscated addresses: "info [at] shop [dot] de", "info(at)shop.de", "info{@}shop(punkt)de"
+AT_TOKEN = r"\s*[\[({]\s*(?:at|@)\s*[\])}]\s*"
+DOT_TOKEN = r"(?:\.|\s*[\[({]\s*(?:dot|punkt|\.)\s*[\])}]\s*)"
+CANDIDATE_PATTERN = re.compile(
+    rf"(?P<plain>[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{{2,}})"
+    rf"|(?P<obfuscated>[a-zA-Z0-9._%+-]+{AT_TOKEN}[a-zA-Z0-9-]+(?:{DOT_TOKEN}[a-zA-Z0-9-]+)*{DOT_TOKEN}[a-zA-Z]{{2,}}\b)",
+    re.IGNORECASE
+)
+AT_PATTERN = re.compile(AT_TOKEN, re.IGNORECASE)
+DOT_PATTERN = re.compile(DOT_TOKEN, re.IGNORECASE)
+OBFUSCATION_HINT = re.compile(r"[\[({]\s*(?:at|@)\s*[\])}]", re.IGNORECASE)
+
+# What may follow an "@" of an address that is still incomplete (e.g. "info@shop.d")
+DOMAIN_RUN = re.compile(r"[a-zA-Z0-9.-]*")
+# Text after a match at the end of the buffer that the next chunk may continue ("info [at] shop (dot")
+OBFUSCATED_RUN = re.compile(r"\s*(?:(?:\.|[\[({]\s*[a-zA-Z.]*\s*[\])}]?\s*)[a-zA-Z0-9-]*)?", re.IGNORECASE)
+
+# Link text/URL keywords of likely contact pages -> visiting order (the Impressum must list an email)
+CONTACT_KEYWORDS = {"impressum": 0, "kontakt": 1, "contact": 1, "about": 2, "über uns": 2}
+
+MAX_CONTACT_LINKS = 3 # Pages visited per site
+MAX_LINK_CANDIDATES = 20
+
+# Text of these elements is not page text (same as BeautifulSoup.get_text())
+SKIP_TEXT_TAGS = {"script", "style", "template"}
+
+# Block elements separate text: "info@shop.de<br>Telefon" must not read as "info@shop.deTelefon"
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "body", "br", "dd", "div", "dl", "dt", "footer", "form",
+    "h1", "h2", "h3", "h4", "h5", "h6", "head", "header", "hr", "li", "main", "nav", "ol", "option", "p",
+    "pre", "section", "table", "td", "th", "title", "tr", "ul"
+}
+
+# Carried over between text chunks so an address split across nodes/chunks is still found
+TEXT_TAIL = 320
+
+def default_backend():
+    return "lxml" if etree is not None else "html.parser"
+
+class PageScan:
+    """
+    Single-pass scan of one HTML page for email candidates (mailto: links,
+    addresses in the page text, obfuscated ones like "info [at] shop.de")
+    and links to likely contact pages.
+
+    Implements lxml's parser target interface (start/end/data/close), so
+    the same state runs behind lxml or the stdlib html.parser. Feed the page
+    in chunks (scan.feed(chunk)) and call finish(). `on_candidate(email,
+    source)` is called for every new candidate; once it returns True the
+    scan is `done` and further chunks are ignored. Without it, the scan is
+    done at the first mailto: (nothing later changes `email`).
+    """
+    def __init__(self, base_url, backend=None, on_candidate=None):
+        self.base_url = base_url
+        self.host = urlparse(base_url).netloc
+        self.backend = backend or default_backend()
+        self.on_candidate = on_candidate
+        self.candidates = {} # email -> source ("mailto", "text", "obfuscated"), in page order
+        self._links = {} # Internal contact link -> priority, in page order
+        self._done = False
+        self._text = "" # Unmatched tail of the page text
+        self._armed = False # Tail ends in a (partial) address: rescan on the next text
+        self._skip_depth = 0 # Inside <script>/<style>/<template>
+        self._anchors = [] # Open <a href> tags: [href, text parts]
+
+        if self.backend == "lxml":
+            if etree is None:
+                raise ValueError("lxml backend requested but lxml is not installed")
+            self._parser = etree.HTMLParser(target=self, recover=True)
+        elif self.backend == "html.parser":
+            self._parser = _StdlibParser(self)
+        else:
+            raise ValueError(f"Unknown parser backend: {self.backend}")
+
+    @property
+    def mailto(self):
+        return next((e for e, source in self.candidates.items() if source == "mailto"), None)
+
+    @property
+    def text_email(self):
+        return next((e for e, source in self.candidates.items() if source != "mailto"), None)
+
+    @property
+    def email(self):
+        """mailto: first (high confidence), then the first address in the text."""
+        return self.mailto or self.text_email
+
+    @property
+    def contact_links(self):
+        """Up to MAX_CONTACT_LINKS internal contact pages, most promising first."""
+        return sorted(self._links, key=self._links.get)[:MAX_CONTACT_LINKS]
+
+    @property
+    def done(self):
+        return self._done
+
+    def feed(self, html):
+        if html and not self._done:
+            self._parser.feed(html)
+
+    def finish(self):
+        """Ends the parse; returns self with the final results."""
+        try:
+            self._parser.close()
+        except Exception:
+            pass # lxml raises on empty/garbled documents, the results so far stand
+        return self
+
+    # Parser target interface (also driven by _StdlibParser)
+    def start(self, tag, attrs):
+        if tag in SKIP_TEXT_TAGS:
+            self._skip_depth += 1
+        elif tag == "a":
+            while self._anchors: # <a> can't nest: a new one closes the open one (like browsers/lxml)
+                self._check_contact_link(*self._anchors.pop())
+            href = attrs.get("href")
+            if href is None:
+                return
+            if href[:7].lower() == "mailto:":
+                for address in unquote(href[7:].split("?")[0]).split(","):
+                    address = address.strip()
+                    if EMAIL_PATTERN.fullmatch(address):
+                        self._add(address, "mailto")
+            self._anchors.append([href, []])
+        elif tag in BLOCK_TAGS:
+            self._break_text()
+
+    def end(self, tag):
+        if tag in SKIP_TEXT_TAGS:
+            self._skip_depth = max(self._skip_depth - 1, 0)
+        elif tag == "a" and self._anchors:
+            self._check_contact_link(*self._anchors.pop())
+        elif tag in BLOCK_TAGS:
+            self._break_text()
+
+    def data(self, text):
+        if self._skip_depth:
+            return
+        for anchor in self._anchors:
+            anchor[1].append(text)
+        self._text += text
+        # No "@" (or "[at]", possibly split from the previous text) anywhere near: nothing to search, just keep the tail
+        if self._armed or "@" in text or OBFUSCATION_HINT.search(self._text, max(len(self._text) - len(text) - 8, 0)):
+            self._scan_text()
+        elif len(self._text) > 2 * TEXT_TAIL:
+            self._text = self._text[-TEXT_TAIL:]
+
+    def close(self):
+        while self._anchors: # Unclosed <a> tags
+            self._check_contact_link(*self._anchors.pop())
+        if self._armed:
+            self._scan_text(final=True)
+        return self
+
+    def _break_text(self):
+        if self._text and not self._skip_depth and not self._text.endswith("\n"):
+            self.data("\n")
+
+    def _scan_text(self, final=False):
+        """Adds every complete address in the buffered text; keeps what may still grow."""
+        text = self._text
+        cut = max(len(text) - TEXT_TAIL, 0)
+        pending = None
+        for match in CANDIDATE_PATTERN.finditer(text):
+            continuation = DOMAIN_RUN if match.group("plain") else OBFUSCATED_RUN
+            if not final and continuation.fullmatch(text, match.end()):
+                pending = match.start() # Might still grow with the next chunk
+                break
+            if match.group("plain"):
+                self._add(match.group("plain"), "text")
+            else:
+                address = DOT_PATTERN.sub(".", AT_PATTERN.sub("@", match.group("obfuscated")))
+                if EMAIL_PATTERN.fullmatch(address):
+                    self._add(address, "obfuscated")
+            cut = max(cut, match.end())
+
+        if pending is not None:
+            self._text = text[pending:]
+            self._armed = True
+        else:
+            self._text = text[cut:]
+            at = self._text.rfind("@")
+            self._armed = bool(
+                (at >= 0 and DOMAIN_RUN.fullmatch(self._text, at + 1)) or OBFUSCATION_HINT.search(self._text)
+            )
+
+    def _add(self, email, source):
+        if self._done or email in self.candidates:
+            return
+        self.candidates[email] = source
+        if self.on_candidate is not None:
+            self._done = bool(self.on_candidate(email, source))
+        elif source == "mailto":
+            self._done = True
+
+    def _check_contact_link(self, href, text_parts):
+        if len(self._links) >= MAX_LINK_CANDIDATES:
+            return
+        text = "".join(text_parts).lower()
+        href_lower = href.lower()
+        priority = min((p for k, p in CONTACT_KEYWORDS.items() if k in text or k in href_lower), default=None)
+        if priority is not None:
+            full_url = urljoin(self.base_url, href)
+            if urlparse(full_url).netloc == self.host and full_url not in self._links: # Internal links only
+                self._links[full_url] = priority
+
+class _StdlibParser(HTMLParser):
+    """Adapts html.parser callbacks to the PageScan target interface."""
+    def __init__(self, target):
+        super().__init__(convert_charrefs=True)
+        self.target = target
+
+    def handle_starttag(self, tag, attrs):
+        self.target.start(tag, {k: v or "" for k, v in attrs})
+
+    def handle_startendtag(self, tag, attrs):
+        if tag not in SKIP_TEXT_TAGS: # <script/> has no content to skip
+            self.target.start(tag, {k: v or "" for k, v in attrs})
+            self.target.end(tag)
+
+    def handle_endtag(self, tag):
+        self.target.end(tag)
+
+    def handle_data(self, data):
+        self.target.data(data)
+
+    def close(self):
+        super().close()
+        self.target.close()
+
+def scan_html(html, base_url, backend=None, on_candidate=None):
+    """Scans a complete page; see PageScan."""
+    scan = PageScan(base_url, backend, on_candidate)
+    scan.feed(html)
+    return scan.finish()
@@ -3,6 +3,7 @@ from google.oauth2.service_account import Credentials
 import pandas as pd
 import streamlit as st
 import json
+import hashlib
 import sqlite3
 from datetime import datetime
 
@@ -37,9 +38,11 @@ def get_gspread_client():
         print(f"❌ Google Sheets Auth Failed: {e}")
         return None
 
-def sync_sqlite_to_sheets(sqlite_db_path="leads.db", sheet_name="Retainer Leads"):
+def sync_sqlite_to_sheets(sqlite_db_path="leads.db", sheet_name="Retainer Leads", full=False):
     """
-    Reads all leads from SQLite and overwrites the Google Sheet.
+    Pushes local lead changes to the Google Sheet.
+    Only rows recorded in sync_log (inserted/updated/deleted) are sent;
+    full=True (or a changed column layout) rewrites the whole sheet.
     Used as 'Save' mechanism.
     """
     client = get_gspread_client()
@@ -53,46 +56,128 @@ def sync_sqlite_to_sheets(sqlite_db_path="leads.db", sheet_name="Retainer Leads"
         except gspread.SpreadsheetNotFound:
             return False, f"Spreadsheet '{sheet_name}' not found. Please create it and share with bot."
 
-        # Read SQLite
         conn = sqlite3.connect(sqlite_db_path)
-        df = pd.read_sql_query("SELECT * FROM leads", conn)
-        conn.close()
+        try:
+            return sync_worksheet(sheet, conn, full=full)
+        finally:
+            conn.close()
         
-        if df.empty:
-            return True, "No data to sync"
+    except Exception as e:
+        print(f"❌ Sync Error: {e}")
+        return False, str(e)
 
-        # Convert date columns to string to avoid serialization errors
-        for col in df.columns:
-            if df[col].dtype == 'object':
-                df[col] = df[col].astype(str)
-                
-        # Prepare data for upload
-        # fillna with empty string because JSON/Sheets doesn't like NaN
-        df_clean = df.fillna("")
+def sync_worksheet(sheet, conn, full=False):
+    """
+    Delta sync engine, independent of auth so it can run against
+    tools.sheets_fake.FakeWorksheet. Works on any gspread-like worksheet.
+    """
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(leads)")]
+    if not columns:
+        return True, "No data to sync"
         
-        # Update Sheet
+    pending = conn.execute("SELECT MAX(seq), COUNT(DISTINCT lead_id) FROM sync_log").fetchone()
+    max_seq, dirty_count = pending[0] or 0, pending[1]
+    
+    # Layout changed (new columns, empty sheet) -> full rewrite
+    if full or sheet.row_values(1) != columns:
+        df = pd.read_sql_query("SELECT * FROM leads ORDER BY id", conn)
+        if df.empty:
+            _clear_sync_log(conn, max_seq)
+            return True, "No data to sync"
+            
         # Update Sheet
         # clear() then update() is safest for full sync
         sheet.clear()
         
         # Use explicit range and values to be safe with different gspread versions
-        data = [df_clean.columns.values.tolist()] + df_clean.values.tolist()
-        try:
-            # Newer gspread
-            sheet.update(range_name='A1', values=data)
-        except TypeError:
-            # Older gspread fallback
-            sheet.update('A1', data)
+        data = [columns] + _sheet_values(df)
+        _update_range(sheet, "A1", data)
         
+        _clear_sync_log(conn, max_seq)
         return True, f"Synced {len(df)} rows to Sheets"
         
-    except Exception as e:
-        print(f"❌ Sync Error: {e}")
-        return False, str(e)
+    if not dirty_count:
+        return True, "Sheets already up to date"
+        
+    # 1. Current state of the dirty rows (missing in leads = deleted)
+    dirty_ids = [row[0] for row in conn.execute("SELECT DISTINCT lead_id FROM sync_log WHERE seq <= ?", (max_seq,))]
+    frames = []
+    for i in range(0, len(dirty_ids), 500):
+        chunk = dirty_ids[i:i + 500]
+        placeholders = ", ".join("?" for _ in chunk)
+        frames.append(pd.read_sql_query(f"SELECT * FROM leads WHERE id IN ({placeholders}) ORDER BY id", conn, params=chunk))
+    df = pd.concat(frames, ignore_index=True)
+    local_rows = {str(row[0]): row for row in _sheet_values(df)}
+    
+    # 2. Where do those IDs live in the sheet? (column A = id, row 1 = header)
+    sheet_rows = {value: n for n, value in enumerate(sheet.col_values(1), start=1) if n > 1}
+    last_col = _col_letter(len(columns))
+    
+    updates, inserts, deletes = [], [], []
+    for lead_id in map(str, dirty_ids):
+        if lead_id in local_rows and lead_id in sheet_rows:
+            n = sheet_rows[lead_id]
+            updates.append({"range": f"A{n}:{last_col}{n}", "values": [local_rows[lead_id]]})
+        elif lead_id in local_rows:
+            inserts.append(local_rows[lead_id])
+        elif lead_id in sheet_rows:
+            deletes.append(sheet_rows[lead_id])
+    
+    # 3. Push: updates first (row numbers still valid), then deletes from the
+    # bottom up, then appends at the end.
+    if updates:
+        sheet.batch_update(updates)
+    for start, end in _row_blocks(sorted(deletes, reverse=True)):
+        sheet.delete_rows(start, end)
+    if inserts:
+        sheet.append_rows(inserts)
+        
+    _clear_sync_log(conn, max_seq)
+    return True, f"Synced {len(updates)} updated, {len(inserts)} new, {len(deletes)} deleted rows"
+
+def _sheet_values(df):
+    """DataFrame -> list of rows Sheets accepts (no NaN, dates as strings)."""
+    # fillna with empty string because JSON/Sheets doesn't like NaN
+    df = df.astype(object).where(df.notna(), "")
+    for col in df.columns:
+        df[col] = df[col].map(lambda v: v if isinstance(v, (int, float, str)) else str(v))
+    return df.values.tolist()
+
+def _update_range(sheet, start, data):
+    try:
+        # Newer gspread
+        sheet.update(range_name=start, values=data)
+    except TypeError:
+        # Older gspread fallback
+        sheet.update(start, data)
+
+def _col_letter(n):
+    """1 -> 'A', 27 -> 'AA'."""
+    letters = ""
+    while n:
+        n, rem = divmod(n - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+def _row_blocks(rows_desc):
+    """Groups descending row numbers into contiguous (start, end) blocks."""
+    blocks = []
+    for n in rows_desc:
+        if blocks and blocks[-1][0] == n + 1:
+            blocks[-1][0] = n
+        else:
+            blocks.append([n, n])
+    return [tuple(b) for b in blocks]
+
+def _clear_sync_log(conn, max_seq):
+    conn.execute("DELETE FROM sync_log WHERE seq <= ?", (max_seq,))
+    conn.commit()
 
 def sync_sheets_to_sqlite(sqlite_db_path="leads.db", sheet_name="Retainer Leads"):
     """
-    Reads all data from Google Sheet and restores it to SQLite.
+    Restores leads from the Google Sheet into SQLite without touching the
+    schema: skipped entirely if the sheet revision is unchanged, otherwise
+    only rows that differ from local state are upserted.
     Used on App Startup to restore persistence.
     """
     client = get_gspread_client()
@@ -102,35 +187,118 @@ def sync_sheets_to_sqlite(sqlite_db_path="leads.db", sheet_name="Retainer Leads"
     try:
         # Open Sheet
         try:
-            sheet = client.open(sheet_name).sheet1
+            spreadsheet = client.open(sheet_name)
+            sheet = spreadsheet.sheet1
         except gspread.SpreadsheetNotFound:
             return False, f"Spreadsheet '{sheet_name}' not found."
             
-        # Get all records
+        conn = sqlite3.connect(sqlite_db_path)
         try:
-            data = sheet.get_all_records()
-        except Exception as e:
-             return False, f"Error reading sheet: {e}"
+            return restore_worksheet(sheet, conn, revision=_revision_marker(spreadsheet))
+        finally:
+            conn.close()
         
-        if not data:
-            return True, "Sheet is empty, keeping local data."
-            
-        df = pd.DataFrame(data)
+    except Exception as e:
+        return False, f"Critical Restore Error: {e}"
+
+def restore_worksheet(sheet, conn, revision=None):
+    """
+    Non-destructive restore engine (works with tools.sheets_fake.FakeWorksheet).
+    1. Same revision marker as last restore -> no download at all.
+    2. Same content checksum as last restore -> nothing to do.
+    3. Otherwise upsert the differing rows in one transaction, except
+       rows with local changes not yet pushed (pending in sync_log).
+    """
+    if revision and _get_state(conn, "sheet_revision") == revision:
+        return True, "Sheet unchanged, skipped download."
         
-        # Connect to SQLite
-        conn = sqlite3.connect(sqlite_db_path)
+    # Get all values
+    try:
+        values = sheet.get_all_values()
+    except Exception as e:
+         return False, f"Error reading sheet: {e}"
+    
+    if len(values) < 2:
+        return True, "Sheet is empty, keeping local data."
         
-        # Validate Schema compatibility before replacing
-        # (Simple check: do we have minimal columns?)
-        if "ID" not in df.columns:
-             conn.close()
-             return False, "Sheet missing 'ID' column. Sync aborted to protect DB."
-
-        # Replace 'leads' table with sheet data
-        df.to_sql("leads", conn, if_exists="replace", index=False)
+    checksum = hashlib.sha256(json.dumps(values).encode()).hexdigest()
+    if _get_state(conn, "sheet_checksum") == checksum:
+        _set_state(conn, "sheet_revision", revision)
+        conn.commit()
+        return True, "Sheet content unchanged, nothing to restore."
+    
+    # Validate Schema compatibility before writing
+    # (Simple check: do we have minimal columns?)
+    header = values[0]
+    local_columns = [row[1] for row in conn.execute("PRAGMA table_info(leads)")]
+    by_lower = {col.lower(): col for col in local_columns}
+    if "id" not in [h.lower() for h in header]:
+        return False, "Sheet missing 'ID' column. Sync aborted to protect DB."
         
-        conn.close()
-        return True, f"Restored {len(df)} rows from Sheets"
+    # Only columns the local table knows (the sheet may be older/newer)
+    positions = [(i, by_lower[h.lower()]) for i, h in enumerate(header) if h.lower() in by_lower]
+    columns = [col for _, col in positions]
+    id_pos = [i for i, col in positions if col == "id"][0]
+    
+    # Write lock before reading local state: edits other sessions commit
+    # meanwhile must not be compared against, or dropped from sync_log below
+    conn.execute("BEGIN IMMEDIATE")
+    
+    # Compare with local state row by row
+    local = pd.read_sql_query(f"SELECT {', '.join(columns)} FROM leads", conn)
+    local_rows = {str(row[columns.index("id")]): [str(v) for v in row] for row in _sheet_values(local)}
+    
+    # Local edits still waiting in sync_log win: the sheet has the old value until they're pushed
+    seq_before = conn.execute("SELECT IFNULL(MAX(seq), 0) FROM sync_log").fetchone()[0]
+    pending_ids = {str(row[0]) for row in conn.execute("SELECT DISTINCT lead_id FROM sync_log WHERE seq <= ?", (seq_before,))}
+    
+    changed = []
+    kept = 0
+    for row in values[1:]:
+        row = row + [""] * (len(header) - len(row))
+        if not str(row[id_pos]).strip():
+            continue
+        if str(row[id_pos]) in pending_ids:
+            kept += 1
+            continue
+        picked = [row[i] for i, _ in positions]
+        if local_rows.get(str(row[id_pos])) != [str(v) for v in picked]:
+            changed.append(tuple(v if v != "" else None for v in picked))
+            
+    if changed:
+        assignments = ", ".join(f"{col} = excluded.{col}" for col in columns if col != "id")
+        conn.executemany(
+            f"INSERT INTO leads ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)}) "
+            f"ON CONFLICT(id) DO UPDATE SET {assignments}",
+            changed
+        )
+        # Restored rows already match the sheet: don't queue them for upload
+        conn.execute("DELETE FROM sync_log WHERE seq > ?", (seq_before,))
         
-    except Exception as e:
-        return False, f"Critical Restore Error: {e}"
+    _set_state(conn, "sheet_checksum", checksum)
+    _set_state(conn, "sheet_revision", revision)
+    conn.commit()
+    message = f"Restored {len(changed)} changed rows from Sheets"
+    if kept:
+        message += f" (kept {kept} rows with unsynced local changes)"
+    return True, message
+
+def _revision_marker(spreadsheet):
+    """Drive modification time of the spreadsheet (None if unavailable)."""
+    try:
+        return spreadsheet.get_lastUpdateTime()
+    except AttributeError:
+        pass # Older gspread
+    except Exception:
+        return None
+    try:
+        return spreadsheet.lastUpdateTime
+    except Exception:
+        return None
+
+def _get_state(conn, key):
+    row = conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+def _set_state(conn, key, value):
+    conn.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (key, value))
@@ -0,0 +1,82 @@
+import re
+
+class FakeWorksheet:
+    """
+    In-memory stand-in for a gspread Worksheet (the subset sheets_db uses).
+    Counts API calls in `calls` so sync strategies can be compared offline:
+
+        sheet = FakeWorksheet()
+        sheets_db.sync_worksheet(sheet, sqlite3.connect("leads.db"))
+        print(sheet.calls, sheet.get_all_values())
+    """
+    def __init__(self, rows=None):
+        self.rows = [list(r) for r in (rows or [])]
+        self.calls = {}
+
+    def _count(self, name):
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    # --- Reads ---
+    def get_all_values(self):
+        self._count("get_all_values")
+        return [list(r) for r in self.rows]
+
+    def get_all_records(self):
+        self._count("get_all_records")
+        if not self.rows:
+            return []
+        header = self.rows[0]
+        return [dict(zip(header, r + [""] * (len(header) - len(r)))) for r in self.rows[1:]]
+
+    def row_values(self, row):
+        self._count("row_values")
+        if row > len(self.rows):
+            return []
+        return [str(v) for v in self.rows[row - 1]]
+
+    def col_values(self, col):
+        self._count("col_values")
+        return [str(r[col - 1]) if len(r) >= col else "" for r in self.rows]
+
+    # --- Writes ---
+    def clear(self):
+        self._count("clear")
+        self.rows = []
+
+    def update(self, range_name=None, values=None, **kwargs):
+        self._count("update")
+        self._write(range_name, values)
+
+    def batch_update(self, data, **kwargs):
+        self._count("batch_update")
+        for entry in data:
+            self._write(entry["range"], entry["values"])
+
+    def append_rows(self, values, **kwargs):
+        self._count("append_rows")
+        self.rows.extend(list(r) for r in values)
+
+    def delete_rows(self, start_index, end_index=None):
+        self._count("delete_rows")
+        end_index = end_index or start_index
+        del self.rows[start_index - 1:end_index]
+
+    def _write(self, range_name, values):
+        row, col = _parse_cell(range_name.split(":")[0])
+        for r_offset, values_row in enumerate(values):
+            target = row + r_offset
+            while len(self.rows) < target:
+                self.rows.append([])
+            current = self.rows[target - 1]
+            needed = col - 1 + len(values_row)
+            current.extend([""] * (needed - len(current)))
+            current[col - 1:needed] = list(values_row)
+
+def _parse_cell(cell):
+    """'B5' -> (5, 2)"""
+    match = re.match(r"([A-Z]+)(\d+)", cell.upper())
+    letters, row = match.groups()
+    col = 0
+    for ch in letters:
+        col = col * 26 + (ord(ch) - 64)
+    return int(row), col
@@ -0,0 +1,140 @@
+import sqlite3
+import threading
+import time
+import tools.sheets_db as sheets
+
+class SyncWorker(threading.Thread):
+    """
+    Background Sheets persistence. Edits only call request_sync(); the
+    worker waits until a burst of edits has settled (debounce), pushes the
+    delta in one go and retries failures with exponential backoff.
+    The outbound queue is the durable sync_log table in SQLite, so pending
+    changes survive restarts and are flushed on the next start.
+    Without a Sheets client (no gcp_service_account) the worker stays idle.
+    """
+    def __init__(self, sqlite_db_path="leads.db", sheet_name="Retainer Leads", debounce=2.0, poll_interval=30.0, max_backoff=300.0, push=None):
+        super().__init__(name="sheets-sync-worker", daemon=True)
+        self.sqlite_db_path = sqlite_db_path
+        self.sheet_name = sheet_name
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.max_backoff = max_backoff
+        self.push = push or sheets.sync_sqlite_to_sheets
+        # Checked once: without credentials every push would fail with "Auth failed"
+        self.enabled = push is not None or sheets.get_gspread_client() is not None
+
+        self._wakeup = threading.Event()
+        self._push_lock = threading.Lock() # One push at a time (worker or manual)
+        self._last_request = 0.0
+        self._stopped = False
+
+        self.last_success = None
+        self.last_error = None
+        self.failures = 0
+        self.next_retry = None
+
+    def request_sync(self):
+        """Non-blocking: marks the queue as dirty and returns immediately."""
+        self._last_request = time.monotonic()
+        self._wakeup.set()
+
+    def sync_now(self, full=False):
+        """Blocking push (manual sync button). Returns (success, message)."""
+        if not self.enabled:
+            return False, "Google Sheets not configured"
+        return self._push(full=full)
+
+    def stop(self):
+        self._stopped = True
+        self._wakeup.set()
+
+    def run(self):
+        if not self.enabled:
+            return
+        # Flush whatever is still queued from a previous process
+        self._wakeup.set()
+        while not self._stopped:
+            self._wakeup.wait(timeout=self.poll_interval)
+            self._wakeup.clear()
+            if self._stopped:
+                break
+
+            # Coalesce: wait until no new request arrived for `debounce` seconds
+            while time.monotonic() - self._last_request < self.debounce:
+                time.sleep(self.debounce / 4)
+
+            if self.queue_depth() == 0:
+                continue
+
+            success, _ = self._push()
+            if not success:
+                # Exponential backoff: 5s, 10s, 20s ... capped at max_backoff
+                delay = min(5 * 2 ** (self.failures - 1), self.max_backoff)
+                self.next_retry = time.time() + delay
+                time.sleep(delay)
+                self._wakeup.set()
+
+    def _push(self, full=False):
+        with self._push_lock:
+            try:
+                success, msg = self.push(self.sqlite_db_path, self.sheet_name, full=full)
+            except Exception as e:
+                success, msg = False, str(e)
+
+        if success:
+            self.last_success = time.time()
+            self.last_error = None
+            self.failures = 0
+            self.next_retry = None
+        else:
+            self.last_error = msg
+            self.failures += 1
+            print(f"⚠️ Background sync failed ({self.failures}x): {msg}")
+        return success, msg
+
+    def queue_depth(self):
+        """Number of leads waiting to be pushed."""
+        return self._queue_stats()[0]
+
+    def _queue_stats(self):
+        try:
+            conn = sqlite3.connect(self.sqlite_db_path)
+            try:
+                row = conn.execute(
+                    "SELECT COUNT(*), (julianday('now') - julianday(MIN(changed_at))) * 86400 FROM sync_log" # One row per lead
+                ).fetchone()
+            finally:
+                conn.close()
+            return row[0], row[1] or 0.0
+        except sqlite3.OperationalError:
+            return 0, 0.0 # sync_log not created yet
+
+    def status(self):
+        """Snapshot for the sidebar: queue depth, lag and last push outcome."""
+        if not self.enabled:
+            return {"enabled": False, "queue_depth": 0, "lag_seconds": 0.0, "last_success": None, "last_error": None, "failures": 0, "retry_in": None}
+        depth, lag = self._queue_stats()
+        return {
+            "enabled": True,
+            "queue_depth": depth,
+            "lag_seconds": round(lag, 1),
+            "last_success": self.last_success,
+            "last_error": self.last_error,
+            "failures": self.failures,
+            "retry_in": max(0, round(self.next_retry - time.time())) if self.next_retry else None
+        }
+
+_worker = None
+_worker_lock = threading.Lock()
+
+def get_worker(**kwargs):
+    """Process-wide worker (shared by all Streamlit sessions), started on first use."""
+    global _worker
+    with _worker_lock:
+        if _worker is None or (_worker.enabled and not _worker.is_alive()):
+            _worker = SyncWorker(**kwargs)
+            _worker.start()
+        return _worker
+
+def request_sync():
+    get_worker().request_sync()
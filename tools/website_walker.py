@@ -1,15 +1,61 @@
 import requests
-from bs4 import BeautifulSoup
-import re
+from requests.adapters import HTTPAdapter
+import codecs
 import time
-from urllib.parse import urljoin, urlparse
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+from tools.domains import normalize_domain
+from tools.email_ranking import EmailRanking, score_email
+from tools.page_scanner import PageScan
+
+# Content types worth scanning; anything else (images, PDFs, feeds, ...) is skipped unread
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
 
 class WebsiteWalker:
-    def __init__(self):
+    def __init__(self, max_workers=8, politeness_delay=1.0, connections_per_host=2, max_hosts=100, cache=None, parser_backend=None,
+                 max_page_bytes=2 * 1024 * 1024, page_timeout=10.0, chunk_size=16 * 1024):
         self.headers = {
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive"
         }
-        self.email_regex = r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}"
+        # Single-pass page scan (tools.page_scanner): "lxml" if installed, else "html.parser"
+        self.parser_backend = parser_backend
+
+        # Streamed downloads: bodies are read in chunks straight into the
+        # scanner, capped in size and total time, so memory per crawl stays
+        # bounded whatever a site serves
+        self.max_page_bytes = max_page_bytes
+        self.page_timeout = page_timeout
+        self.chunk_size = chunk_size
+        self._download_stats = {"sites": 0, "pages": 0, "bytes": 0, "confident": 0, "early_exit": 0, "truncated": 0, "skipped_type": 0}
+
+        # Concurrency: global cap on parallel crawls + per-host politeness
+        self.max_workers = max_workers
+        self.politeness_delay = politeness_delay
+        self._host_lock = threading.Lock()
+        self._host_next_slot = {} # host -> earliest time for the next request
+
+        # Pooled session: keep-alive connections are reused across pages of
+        # the same host (homepage -> Impressum) instead of a new TCP/TLS
+        # handshake per request. pool_block caps the connections per host.
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self._adapter = _CountingAdapter(
+            self._count_connection,
+            pool_connections=max_hosts,
+            pool_maxsize=connections_per_host,
+            pool_block=True
+        )
+        self.session.mount("http://", self._adapter)
+        self.session.mount("https://", self._adapter)
+        self._request_count = 0
+        self._connections_opened = 0
+
+        # Optional persistent result cache (tools.crawl_cache.CrawlCache)
+        self.cache = cache
 
     def clean_url(self, url):
         """Ensures URL starts with http/https."""
@@ -20,73 +66,308 @@ class WebsiteWalker:
     def find_email(self, url):
         """
         Crawls the homepage and common subpages (Contact, Impressum) for emails.
-        Returns the first email found or None.
+        Every candidate is scored (tools.email_ranking); the crawl stops at
+        the first high-confidence one. Returns the best email found or None.
         """
         url = self.clean_url(url)
+
+        # 0. Known domain? Answer from the cache without touching the network
+        if self.cache:
+            hit, email = self.cache.get(url)
+            # Entries of the old first-match crawl may hold junk (logo@2x.png, tracking): re-check, crawl again if rejected
+            if hit and email and score_email(email, "text", normalize_domain(url)) is None:
+                print(f"🗑️ Discarding cached {email} for {url} (not a contact address)")
+            elif hit:
+                print(f"💾 Cache hit for {url}: {email}")
+                return email
+
         print(f"🕷️ Crawling {url}...")
+        self._count_download(sites=1)
+        ranking = EmailRanking(url)
         
-        # 1. Check Homepage
-        email = self._scan_page(url)
-        if email: return email
+        # 1. Check Homepage (fetched and scanned exactly once)
+        page = self._fetch_page(url, ranking)
+        if page is None:
+            return None # Unreachable: don't cache, might be temporary
 
-        # 2. Find "Contact" or "Impressum" links
-        subpages = self._find_contact_links(url)
-        
-        # 3. Scan Subpages
-        for link in subpages:
-            time.sleep(1) # Be polite
-            email = self._scan_page(link)
-            if email: return email
+        email = self._crawl(page, ranking)
+        if self.cache:
+            self.cache.put(url, email)
+        return email
+
+    def _crawl(self, page, ranking):
+        """Ranks the homepage's candidates, then those of its contact pages until one is high confidence."""
+        if ranking.confident:
+            self._count_download(confident=1)
+            return ranking.best
+
+        # 2. "Contact" or "Impressum" links were collected in the same pass
+        # 3. Scan Subpages (politeness is enforced per host in _get)
+        for link in page.contact_links:
+            self._fetch_page(link, ranking)
+            if ranking.confident:
+                self._count_download(confident=1)
+                break
             
-        return None
+        return ranking.best
+
+    def find_emails(self, urls, max_workers=None, stop=None):
+        """
+        Crawls many websites concurrently (bounded thread pool).
+        Yields (url, email) tuples in completion order, so wall-clock time
+        follows the slowest site instead of the sum of all sites.
+        `urls` may also be a lazy iterator (e.g. ads still streaming in from
+        Apify): each crawl then starts as soon as its URL arrives, and `stop`
+        (threading.Event) is set once the consumer is gone, so the producer
+        can stop waiting for more (MetaClient.stream_ads(stop=...)).
+        Closing the generator early cancels the crawls not started yet and
+        only waits for the running ones.
+        """
+        if not isinstance(urls, (list, tuple, set, dict)):
+            yield from self._find_emails_streaming(urls, max_workers or self.max_workers, stop)
+            return
+
+        urls = list(dict.fromkeys(urls)) # Keep order, drop duplicates
+        if not urls:
+            return
+
+        workers = min(max_workers or self.max_workers, len(urls))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(self.find_email, url): url for url in urls}
+            try:
+                for future in as_completed(futures):
+                    url = futures[future]
+                    try:
+                        email = future.result()
+                    except Exception as e:
+                        print(f"⚠️ Error crawling {url}: {e}")
+                        email = None
+                    yield url, email
+            finally:
+                pool.shutdown(wait=False, cancel_futures=True) # Consumer gone: drop queued crawls
+
+    def _find_emails_streaming(self, urls, workers, stop=None):
+        """
+        A feeder thread consumes `urls` and submits crawls while this
+        generator yields finished ones, so a slow producer (polling) never
+        holds back results. At most 2 * `workers` crawls are submitted and
+        not finished at a time, so the pool's queue never holds the whole
+        stream. Errors of the producer are re-raised here.
+        """
+        results = queue.Queue()
+        stopped = stop or threading.Event()
+        in_flight = threading.Semaphore(2 * workers)
+        feed_done = object()
+        feed_error = []
+
+        def crawl(url):
+            try:
+                email = None if stopped.is_set() else self.find_email(url)
+            except Exception as e:
+                print(f"⚠️ Error crawling {url}: {e}")
+                email = None
+            finally:
+                in_flight.release()
+            results.put((url, email))
+
+        def feed(pool):
+            submitted = set()
+            try:
+                for url in urls:
+                    if stopped.is_set():
+                        break
+                    if url in submitted: # Drop duplicates
+                        continue
+                    while not in_flight.acquire(timeout=0.1): # Pool busy: wait, but not past a stop
+                        if stopped.is_set():
+                            return
+                    submitted.add(url)
+                    pool.submit(crawl, url)
+            except Exception as e:
+                feed_error.append(e)
+            finally:
+                results.put((feed_done, len(submitted)))
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            feeder = threading.Thread(target=feed, args=(pool,), name="crawl-feeder", daemon=True)
+            feeder.start()
+            expected, received = None, 0
+            try:
+                while expected is None or received < expected:
+                    url, email = results.get()
+                    if url is feed_done:
+                        expected = email
+                        continue
+                    received += 1
+                    yield url, email
+            finally:
+                stopped.set() # Consumer gone (or done): stop feeding new crawls and the producer
+                pool.shutdown(wait=False, cancel_futures=True) # Queued crawls are dropped, running ones finish
+                feeder.join()
+        if feed_error:
+            raise feed_error[0]
+
+    def _wait_for_host(self, url):
+        """
+        Per-host politeness: requests to the same host are spaced by
+        `politeness_delay` seconds, different hosts never wait on each other.
+        """
+        host = urlparse(url).netloc.lower()
+        with self._host_lock:
+            now = time.monotonic()
+            slot = max(now, self._host_next_slot.get(host, 0))
+            self._host_next_slot[host] = slot + self.politeness_delay
+        if slot > now:
+            time.sleep(slot - now)
+
+    def _get(self, url):
+        self._wait_for_host(url)
+        with self._host_lock:
+            self._request_count += 1
+        return self.session.get(url, timeout=self.page_timeout, stream=True)
+
+    def connection_stats(self):
+        """
+        Reports how many requests were served over reused keep-alive
+        connections (new connections are counted as they are opened, so
+        pools evicted after `max_hosts` hosts still count).
+        """
+        with self._host_lock:
+            opened = self._connections_opened
+            requests_sent = self._request_count
+        reused = max(requests_sent - opened, 0)
+        return {
+            "requests": requests_sent,
+            "connections_opened": opened,
+            "connections_reused": reused,
+            "reuse_ratio": round(reused / requests_sent, 3) if requests_sent else 0.0
+        }
+
+    def _count_connection(self):
+        with self._host_lock:
+            self._connections_opened += 1
+
+    def download_stats(self):
+        """
+        Sites crawled, pages/bytes read (pages / sites = pages per lead), how
+        many crawls ended on a high-confidence email and how many downloads
+        ended early (email found, size cap, non-HTML).
+        """
+        with self._host_lock:
+            return dict(self._download_stats)
+
+    def _count_download(self, **counts):
+        with self._host_lock:
+            for key, value in counts.items():
+                self._download_stats[key] += value
+
+    def close(self):
+        """Closes all pooled connections."""
+        self.session.close()
+
+    def _fetch_page(self, url, ranking=None):
+        """
+        Downloads a page and scans it in one pass (email candidates,
+        contact links). Returns the PageScan or None if the page is
+        unavailable or not HTML. Candidates go into `ranking` (EmailRanking).
+
+        The body is streamed in chunks into the scanner and the download
+        stops as soon as the ranking is confident (without a ranking: at the
+        first mailto:), after `max_page_bytes` (decompressed) or after
+        `page_timeout` seconds in total; the scan of what was read stands.
+        """
+        try:
+            response = self._get(url)
+        except Exception as e:
+            print(f"⚠️ Error crawling {url}: {e}")
+            return None
 
-    def _scan_page(self, url):
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
             if response.status_code != 200:
                 return None
-            
-            # Search in Mailto links first (High confidence)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            mailto = soup.select_one("a[href^='mailto:']")
-            if mailto:
-                return mailto['href'].replace("mailto:", "").split("?")[0].strip()
-
-            # Search in text (Regex)
-            text = soup.get_text()
-            match = re.search(self.email_regex, text)
-            if match:
-                return match.group(0)
-            
+            content_type = response.headers.get("Content-Type", "")
+            mime = content_type.split(";")[0].strip().lower()
+            if mime and mime not in HTML_CONTENT_TYPES:
+                self._count_download(skipped_type=1)
+                print(f"⏭️ Skipping {url} ({mime})")
+                return None
+
+            page = PageScan(url, self.parser_backend, ranking.add if ranking else None)
+            decoder = self._decoder(response, content_type)
+            deadline = time.monotonic() + self.page_timeout
+            read = 0
+            for chunk in self._iter_body(response):
+                read += len(chunk)
+                page.feed(decoder.decode(chunk))
+                if page.done:
+                    self._count_download(early_exit=1)
+                    break
+                if read >= self.max_page_bytes or time.monotonic() > deadline:
+                    self._count_download(truncated=1)
+                    print(f"✂️ Truncated {url} after {read // 1024} KB")
+                    break
+            else:
+                page.feed(decoder.decode(b"", final=True))
+            self._count_download(pages=1, bytes=read)
+            return page.finish()
         except Exception as e:
             print(f"⚠️ Error crawling {url}: {e}")
+        finally:
+            response.close() # Back to the pool (or dropped, if the body wasn't read to the end)
         return None
 
-    def _find_contact_links(self, base_url):
-        """Finds links to likely contact pages."""
-        likely_pages = []
+    def _iter_body(self, response):
+        """
+        Decompressed body chunks as they arrive (urllib3 2: read1 returns
+        what one socket read delivers, so a slowly dripping page can't
+        stall a chunk past the deadline). Older urllib3: fixed-size chunks.
+        """
+        raw = response.raw
+        if not hasattr(raw, "read1"):
+            yield from response.iter_content(chunk_size=self.chunk_size)
+            return
+        while True:
+            chunk = raw.read1(self.chunk_size, decode_content=True)
+            if not chunk:
+                return
+            yield chunk
+
+    @staticmethod
+    def _decoder(response, content_type):
+        """
+        Incremental decoder for the body: the charset from the header, else
+        UTF-8 (what shops serve; requests' ISO-8859-1 default for text/* is
+        rarely right and guessing would need the whole body).
+        """
+        encoding = response.encoding if "charset" in content_type.lower() else "utf-8"
         try:
-            response = requests.get(base_url, headers=self.headers, timeout=10)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            keywords = ["contact", "kontakt", "impressum", "about", "über uns"]
-            
-            for a in soup.find_all("a", href=True):
-                href = a['href']
-                text = a.get_text().lower()
-                
-                # Check if keyword in text or URL
-                if any(k in text or k in href.lower() for k in keywords):
-                    full_url = urljoin(base_url, href)
-                    if urlparse(full_url).netloc == urlparse(base_url).netloc: # Internal links only
-                        likely_pages.append(full_url)
-                        
-        except Exception:
-            pass
-        
-        return list(set(likely_pages))[:3] # Limit to 3 pages
+            return codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+        except LookupError:
+            return codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+class _CountingAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools report every new connection to `on_new_connection`."""
+    def __init__(self, on_new_connection, **kwargs):
+        self._on_new_connection = on_new_connection
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        pool_classes = self.poolmanager.pool_classes_by_scheme
+        self.poolmanager.pool_classes_by_scheme = {
+            scheme: _counting_pool(pool_cls, self._on_new_connection) for scheme, pool_cls in pool_classes.items()
+        }
+
+def _counting_pool(pool_cls, on_new_connection):
+    class CountingPool(pool_cls):
+        def _new_conn(self):
+            on_new_connection()
+            return super()._new_conn()
+    return CountingPool
 
 if __name__ == "__main__":
     walker = WebsiteWalker()
     # Test on a safe site or example
     print(walker.find_email("https://www.example.com"))
+    print(walker.connection_stats())
+    print(walker.download_stats())